@@ -1,6 +1,6 @@
 import discord
 import asyncio
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from redbot.core import commands, Config
 from redbot.core.bot import Red
 from redbot.core.utils.chat_formatting import bold, box
@@ -8,10 +8,26 @@ from redbot.core.utils.chat_formatting import bold, box
 import logging
 import json
 import os
-import re
+from typing import Dict, FrozenSet, NamedTuple, Optional, Set
+
+from .matcher import BlockedWordMatcher
+from .warnings import WarningStore
 
 log = logging.getLogger("red.automod")
 
+PROTECTED_ROLE_NAME = "KCN | Protected"
+WARNINGS_FILE = "automod_warnings.db"
+SWEEP_INTERVAL = 3600  # seconds between expired warning sweeps
+SWEEP_BATCH = 500
+
+
+class GuildSettings(NamedTuple):
+    """What on_message and global mutes need from a guild's config, resolved once."""
+    enabled: bool
+    immune_roles: FrozenSet[int]
+    muted_role: Optional[int]
+    match_phrases: bool
+
 
 class AutoMod(commands.Cog):
     """Automod integration with Discord AutoMod system."""
@@ -26,10 +42,11 @@ class AutoMod(commands.Cog):
             "muted_role": None,
             "automod_enabled": False,
             "immune_roles": [],  # Store immune roles
+            "match_phrases": False,  # also enforce multi-word / punctuated entries of the list
         }
 
         default_member = {
-            "warnings": []
+            "warnings": []  # legacy, moved into the warning store on load
         }
 
         self.config.register_guild(**default_guild)
@@ -39,7 +56,56 @@ class AutoMod(commands.Cog):
         self.max_warnings = 3
         self.muted_role_name = "KCN | Muted"
 
-        self.blocked_words = self.load_blocked_words()
+        self.blocked_words = BlockedWordMatcher(self.load_blocked_words())
+        self._guild_settings: Dict[int, GuildSettings] = {}
+        self._member_guilds: Optional[Dict[int, Set[int]]] = None  # user ID -> IDs of guilds they're in
+        self.warning_store = WarningStore(WARNINGS_FILE)
+        self._sweep_task: Optional[asyncio.Task] = None
+        self._index_task: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        await self.migrate_config_warnings()
+        if self._sweep_task is None or self._sweep_task.done():
+            self._sweep_task = asyncio.create_task(self.warning_sweep_loop())
+        if self._index_task is None or self._index_task.done():
+            self._index_task = asyncio.create_task(self.build_member_index())
+
+    async def cog_unload(self):
+        for task in (self._sweep_task, self._index_task):
+            if task is not None:
+                task.cancel()
+        self.warning_store.close()
+
+    @property
+    def warning_lifetime(self) -> float:
+        return self.warning_expiry_days * 86400
+
+    async def migrate_config_warnings(self):
+        """Move warnings still kept in member Config into the warning store."""
+        members = await self.config.all_members()
+        rows = []
+        for guild_id, guild_members in members.items():
+            for member_id, data in guild_members.items():
+                for w in data.get("warnings") or []:
+                    created = datetime.fromisoformat(w["timestamp"]).replace(tzinfo=timezone.utc).timestamp()
+                    rows.append((guild_id, member_id, w["reason"], w.get("content"), created, created + self.warning_lifetime))
+        if not rows:
+            return
+        await self.warning_store.import_rows(rows)
+        for guild_id, guild_members in members.items():
+            for member_id in guild_members:
+                await self.config.member_from_ids(guild_id, member_id).warnings.clear()
+        log.info("Moved %d warnings from Config into %s", len(rows), WARNINGS_FILE)
+
+    async def warning_sweep_loop(self):
+        while True:
+            try:
+                deleted = await self.warning_store.sweep(SWEEP_BATCH)
+                if deleted:
+                    log.debug("Swept %d expired warnings", deleted)
+            except Exception:
+                log.exception("Expired warning sweep failed")
+            await asyncio.sleep(SWEEP_INTERVAL)
 
     def load_blocked_words(self):
         path = os.path.join(os.path.dirname(__file__), "blocked_words.txt")
@@ -54,57 +120,136 @@ class AutoMod(commands.Cog):
             log.error(f"JSON error in blocked_words.txt: {e}")
             return []
 
+    async def guild_settings(self, guild: discord.Guild) -> GuildSettings:
+        """Cached settings snapshot; dropped by the automod commands and role changes."""
+        settings = self._guild_settings.get(guild.id)
+        if settings is None:
+            data = await self.config.guild(guild).all()
+            # The immune roles added via guildrole, plus "KCN | Protected" as a default immune role
+            immune_roles = set(data.get("immune_roles", []))
+            protected = discord.utils.get(guild.roles, name=PROTECTED_ROLE_NAME)
+            if protected:
+                immune_roles.add(protected.id)
+            settings = GuildSettings(
+                enabled=data["automod_enabled"],
+                immune_roles=frozenset(immune_roles),
+                muted_role=data["muted_role"],
+                match_phrases=data["match_phrases"],
+            )
+            self._guild_settings[guild.id] = settings
+        return settings
+
+    def invalidate_settings(self, guild: discord.Guild):
+        self._guild_settings.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.invalidate_settings(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.invalidate_settings(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self.invalidate_settings(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.invalidate_settings(guild)
+        if self._member_guilds is not None:
+            for user_id in [uid for uid, guild_ids in self._member_guilds.items() if guild.id in guild_ids]:
+                self._unindex_member(user_id, guild.id)
+
+    async def build_member_index(self):
+        # Ready means the member cache has been chunked; indexing earlier would miss
+        # members that are only cached later.
+        await self.bot.wait_until_ready()
+        member_guilds = {}
+        for guild in self.bot.guilds:
+            for member in guild.members:
+                member_guilds.setdefault(member.id, set()).add(guild.id)
+        self._member_guilds = member_guilds
+
+    def member_guilds(self, user_id: int) -> Set[int]:
+        """IDs of the guilds ``user_id`` is in, from the member reverse index.
+
+        The index is built once the bot is ready and kept current by the join/remove
+        and guild availability listeners. Until then every guild is checked directly.
+        """
+        if self._member_guilds is None:
+            return {guild.id for guild in self.bot.guilds if guild.get_member(user_id)}
+        return self._member_guilds.get(user_id, set())
+
+    def _index_guild(self, guild: discord.Guild):
+        for member in guild.members:
+            self._member_guilds.setdefault(member.id, set()).add(guild.id)
+
+    def _unindex_member(self, user_id: int, guild_id: int):
+        guild_ids = self._member_guilds.get(user_id)
+        if guild_ids is not None:
+            guild_ids.discard(guild_id)
+            if not guild_ids:
+                del self._member_guilds[user_id]
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if self._member_guilds is not None:
+            self._index_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        # Back from an outage (or chunked late); pick up members cached since.
+        if self._member_guilds is not None:
+            self._index_guild(guild)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        if self._member_guilds is not None:
+            self._member_guilds.setdefault(member.id, set()).add(member.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        if self._member_guilds is not None:
+            self._unindex_member(member.id, member.guild.id)
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         if not message.guild or message.author.bot:
             return
 
-        if not await self.config.guild(message.guild).automod_enabled():
+        settings = await self.guild_settings(message.guild)
+        if not settings.enabled:
             return
 
-        # Get the list of immune roles (including the ones added via guildrole)
-        immune_roles = await self.config.guild(message.guild).get_raw("immune_roles", default=[])
-
-        # Add the "KCN | Protected" role as a default immune role
-        immune_roles.append(discord.utils.get(message.guild.roles, name="KCN | Protected").id)
-
         # Check if the user has any immune roles
-        user_roles = [role.id for role in message.author.roles]
-        if any(role_id in immune_roles for role_id in user_roles):
+        if any(role.id in settings.immune_roles for role in message.author.roles):
             return  # Skip automod actions for users with immune roles
 
         # Word matching - avoids substrings like "night" for "nig"
-        words = re.findall(r"\b\w+\b", message.content.lower())
-        if any(word in self.blocked_words for word in words):
+        blocked_word = self.blocked_words.match(message.content, phrases=settings.match_phrases)
+        if blocked_word:
             try:
                 await message.delete()
             except discord.Forbidden:
                 pass
 
-            await self.add_warning(message.guild, message.author, "Blocked word usage", message.content)
+            await self.add_warning(message.guild, message.author, "Blocked word usage", message.content, blocked_word)
             await self.send_alert(message.guild, message.author, message.content)
 
-    async def add_warning(self, guild: discord.Guild, user: discord.Member, reason: str, original_message: str):
-        now = datetime.utcnow()
-        warnings = await self.config.member(user).warnings()
-
-        warnings = [w for w in warnings if datetime.fromisoformat(w["timestamp"]) + timedelta(days=self.warning_expiry_days) > now]
-
-        warning_entry = {"reason": reason, "timestamp": now.isoformat(), "content": original_message}
-        warnings.append(warning_entry)
-        await self.config.member(user).warnings.set(warnings)
-
-        warn_count = len(warnings)
-        await self.send_dm(guild, user, original_message, warn_count)
+    async def add_warning(self, guild: discord.Guild, user: discord.Member, reason: str, original_message: str, blocked_word: str = None):
+        warn_count = await self.warning_store.add(guild.id, user.id, reason, original_message, self.warning_lifetime)
+        await self.send_dm(guild, user, original_message, warn_count, blocked_word)
 
         if warn_count >= self.max_warnings:
             await self.send_mute_dm(user)
             await self.global_mute(user)
-            await self.send_warning_embed(guild, user, warnings)
+            await self.send_warning_embed(guild, user, await self.warning_store.active(guild.id, user.id))
 
-    async def send_dm(self, guild: discord.Guild, user: discord.Member, original_message: str, warn_count: int):
+    async def send_dm(self, guild: discord.Guild, user: discord.Member, original_message: str, warn_count: int, blocked_word: str = None):
         try:
-            blocked_word = next((bw for bw in self.blocked_words if bw in original_message.lower()), "a blocked word")
+            blocked_word = blocked_word or "a blocked word"
 
             embed = discord.Embed(
                 title=f"⚠️ Warning #{warn_count}: Blocked Word Usage",
@@ -151,7 +296,7 @@ class AutoMod(commands.Cog):
         )
         embed.set_author(name=str(user), icon_url=user.display_avatar.url)
         for i, w in enumerate(warnings, 1):
-            embed.add_field(name=f"Warning {i}", value=f"Reason: {w['reason']} — <t:{int(datetime.fromisoformat(w['timestamp']).timestamp())}:R>\nMessage: {w['content']}", inline=False)
+            embed.add_field(name=f"Warning {i}", value=f"Reason: {w['reason']} — <t:{int(w['created_at'])}:R>\nMessage: {w['content']}", inline=False)
         embed.set_footer(text=f"User ID: {user.id}")
 
         allowed_mentions = discord.AllowedMentions(roles=True, users=True, everyone=False)
@@ -161,19 +306,28 @@ class AutoMod(commands.Cog):
         await alert_channel.send(content=content, embed=embed, allowed_mentions=allowed_mentions)
 
     async def global_mute(self, user: discord.User):
-        for guild in self.bot.guilds:
-            role_id = await self.config.guild(guild).muted_role()
-            if not role_id:
-                continue
-            role = guild.get_role(role_id)
-            if not role:
-                continue
-            member = guild.get_member(user.id)
-            if member:
-                try:
-                    await member.add_roles(role, reason="Reached 3 warnings")
-                except discord.Forbidden:
-                    pass
+        await self.set_muted(user, True, "Reached 3 warnings")
+
+    async def set_muted(self, user: discord.User, muted: bool, reason: str):
+        """Add or remove the muted role in every guild the user is in, concurrently."""
+        await asyncio.gather(*(self._set_muted_in(guild_id, user.id, muted, reason) for guild_id in list(self.member_guilds(user.id))))
+
+    async def _set_muted_in(self, guild_id: int, user_id: int, muted: bool, reason: str):
+        guild = self.bot.get_guild(guild_id)
+        member = guild.get_member(user_id) if guild else None
+        if not member:
+            return
+        settings = await self.guild_settings(guild)
+        role = guild.get_role(settings.muted_role) if settings.muted_role else None
+        if not role or (role in member.roles) == muted:
+            return
+        try:
+            if muted:
+                await member.add_roles(role, reason=reason)
+            else:
+                await member.remove_roles(role, reason=reason)
+        except discord.HTTPException as e:
+            log.warning("Could not %s %s in %s: %s", "mute" if muted else "unmute", user_id, guild_id, e)
 
     @commands.is_owner()
     @commands.guild_only()
@@ -214,12 +368,14 @@ class AutoMod(commands.Cog):
                 continue
 
         await self.config.guild(ctx.guild).muted_role.set(muted_role.id)
+        self.invalidate_settings(ctx.guild)
         await ctx.send("Setup complete!")
 
     @automod.command()
     async def resetconfig(self, ctx: commands.Context):
         """Reset all configuration."""
         await self.config.guild(ctx.guild).clear()
+        self.invalidate_settings(ctx.guild)
         await ctx.send("Configuration reset.")
 
     @automod.command()
@@ -228,24 +384,35 @@ class AutoMod(commands.Cog):
         current = await self.config.guild(ctx.guild).automod_enabled()
         new_state = not current
         await self.config.guild(ctx.guild).automod_enabled.set(new_state)
+        self.invalidate_settings(ctx.guild)
         state_text = "enabled" if new_state else "disabled"
         await ctx.send(f"Automod has been {state_text}.")
 
+    @automod.command()
+    async def phrases(self, ctx: commands.Context):
+        """Toggle matching of multi-word and punctuated blocked list entries."""
+        current = await self.config.guild(ctx.guild).match_phrases()
+        new_state = not current
+        await self.config.guild(ctx.guild).match_phrases.set(new_state)
+        self.invalidate_settings(ctx.guild)
+        state_text = "enabled" if new_state else "disabled"
+        await ctx.send(f"Phrase matching has been {state_text}.")
+
     @commands.has_permissions(manage_guild=True)
     @commands.command()
     async def warnings(self, ctx: commands.Context, user: discord.Member):
         """Check a user's warnings."""
-        warnings = await self.config.member(user).warnings()
+        warnings = await self.warning_store.active(ctx.guild.id, user.id)
         if not warnings:
             return await ctx.send("No warnings.")
-        msg = "\n".join(f"{i+1}. {w['reason']} — <t:{int(datetime.fromisoformat(w['timestamp']).timestamp())}:R>" for i, w in enumerate(warnings))
+        msg = "\n".join(f"{i+1}. {w['reason']} — <t:{int(w['created_at'])}:R>" for i, w in enumerate(warnings))
         await ctx.send(box(msg))
 
     @commands.has_permissions(manage_guild=True)
     @commands.command()
     async def clearwarns(self, ctx: commands.Context, user: discord.Member):
         """Clear a user's warnings."""
-        await self.config.member(user).warnings.set([])
+        await self.warning_store.clear(ctx.guild.id, user.id)
         await ctx.send(f"Cleared warnings for {user.mention}.")
 
     @commands.has_permissions(moderate_members=True)
@@ -259,19 +426,7 @@ class AutoMod(commands.Cog):
     @commands.command()
     async def sunmute(self, ctx: commands.Context, user: discord.User):
         """Globally unmute a user."""
-        for guild in self.bot.guilds:
-            role_id = await self.config.guild(guild).muted_role()
-            if not role_id:
-                continue
-            role = guild.get_role(role_id)
-            if not role:
-                continue
-            member = guild.get_member(user.id)
-            if member and role in member.roles:
-                try:
-                    await member.remove_roles(role, reason="Manual unmute")
-                except discord.Forbidden:
-                    continue
+        await self.set_muted(user, False, "Manual unmute")
         await ctx.send(f"{user.mention} has been unmuted in all shared servers.")
 
     @commands.is_owner()
@@ -283,7 +438,7 @@ class AutoMod(commands.Cog):
         if not role:
             return await ctx.send(f"Role with ID {role_id} not found.")
 
-        immune_role_name = "KCN | Protected"
+        immune_role_name = PROTECTED_ROLE_NAME
         current_immune_roles = await self.config.guild(ctx.guild).get_raw("immune_roles", default=[])
 
         # Prevent removal of "KCN | Protected"
@@ -300,6 +455,7 @@ class AutoMod(commands.Cog):
             
             current_immune_roles.append(role.id)
             await self.config.guild(ctx.guild).immune_roles.set(current_immune_roles)
+            self.invalidate_settings(ctx.guild)
             await ctx.send(f"{role.name} has been added as the immune role.")
         
         else:  # Remove role
@@ -308,6 +464,7 @@ class AutoMod(commands.Cog):
             
             current_immune_roles.remove(role.id)
             await self.config.guild(ctx.guild).immune_roles.set(current_immune_roles)
+            self.invalidate_settings(ctx.guild)
             await ctx.send(f"{role.name} has been removed as the immune role.")
 
     async def send_alert(self, guild: discord.Guild, user: discord.Member, original_message: str):
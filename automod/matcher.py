@@ -0,0 +1,89 @@
+import re
+from collections import deque
+from typing import Iterable, List, Optional
+
+TOKEN_PATTERN = re.compile(r"\b\w+\b")
+WORD_ONLY = re.compile(r"^\w+$")
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class BlockedWordMatcher:
+    """Finds the first blocked term in a message.
+
+    Single-word terms are looked up token by token in a frozenset, as the word
+    matching always did. Everything else (phrases such as ``"blow job"`` or terms
+    with punctuation such as ``"b!tch"``) goes into an Aho-Corasick automaton that
+    scans the message once no matter how many terms there are. Phrase hits must
+    still sit on word boundaries, so ``"ass hat"`` doesn't fire inside ``"class hat"``.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        terms = {term.strip().lower() for term in terms if term and term.strip()}
+        self.tokens = frozenset(term for term in terms if WORD_ONLY.match(term))
+        self.phrases = sorted(terms - self.tokens)
+        self._build(self.phrases)
+
+    def __len__(self) -> int:
+        return len(self.tokens) + len(self.phrases)
+
+    def _build(self, phrases: List[str]):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]  # per state: phrases ending here, via fail links too, longest first
+        for phrase in phrases:
+            state = 0
+            for ch in phrase:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] = (phrase,)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _match_phrase(self, text: str) -> Optional[str]:
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        last = len(text) - 1
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for phrase in out[state]:
+                start = i - len(phrase) + 1
+                if _is_word_char(phrase[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(phrase[-1]) and i < last and _is_word_char(text[i + 1]):
+                    continue
+                return phrase
+        return None
+
+    def match(self, content: str, phrases: bool = True) -> Optional[str]:
+        """Return the blocked term found in ``content``, or None.
+
+        With ``phrases=False`` only single-word terms are checked.
+        """
+        text = content.lower()
+        if self.tokens:
+            for word in TOKEN_PATTERN.findall(text):
+                if word in self.tokens:
+                    return word
+        if phrases and self.phrases:
+            return self._match_phrase(text)
+        return None
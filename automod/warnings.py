@@ -0,0 +1,121 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    guild_id INTEGER NOT NULL,
+    member_id INTEGER NOT NULL,
+    reason TEXT NOT NULL,
+    content TEXT,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS warnings_member ON warnings (guild_id, member_id, expires_at);
+CREATE INDEX IF NOT EXISTS warnings_expiry ON warnings (expires_at);
+"""
+
+
+class WarningStore:
+    """SQLite table of AutoMod warnings, indexed by guild, member and expiry.
+
+    Queries run in a worker thread on one shared connection. Expired rows are
+    ignored by every read and deleted in batches by :meth:`sweep`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(*args)
+
+    async def _call(self, fn, *args):
+        return await asyncio.to_thread(self._run, fn, *args)
+
+    def _add_sync(self, row: tuple) -> int:
+        self._conn.execute(
+            "INSERT INTO warnings (guild_id, member_id, reason, content, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+            row,
+        )
+        self._conn.commit()
+        return self._count_sync(row[0], row[1], row[4])
+
+    async def add(self, guild_id: int, member_id: int, reason: str, content: str, lifetime: float) -> int:
+        """Record a warning and return how many the member now has active."""
+        now = time.time()
+        return await self._call(self._add_sync, (guild_id, member_id, reason, content, now, now + lifetime))
+
+    def _count_sync(self, guild_id: int, member_id: int, now: float) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(*) FROM warnings WHERE guild_id = ? AND member_id = ? AND expires_at > ?",
+            (guild_id, member_id, now),
+        ).fetchone()[0]
+
+    async def count(self, guild_id: int, member_id: int) -> int:
+        return await self._call(self._count_sync, guild_id, member_id, time.time())
+
+    def _active_sync(self, guild_id: int, member_id: int, now: float) -> List[sqlite3.Row]:
+        return self._conn.execute(
+            "SELECT reason, content, created_at FROM warnings "
+            "WHERE guild_id = ? AND member_id = ? AND expires_at > ? ORDER BY created_at",
+            (guild_id, member_id, now),
+        ).fetchall()
+
+    async def active(self, guild_id: int, member_id: int) -> List[sqlite3.Row]:
+        """The member's unexpired warnings, oldest first."""
+        return await self._call(self._active_sync, guild_id, member_id, time.time())
+
+    def _clear_sync(self, guild_id: int, member_id: int):
+        self._conn.execute("DELETE FROM warnings WHERE guild_id = ? AND member_id = ?", (guild_id, member_id))
+        self._conn.commit()
+
+    async def clear(self, guild_id: int, member_id: int):
+        await self._call(self._clear_sync, guild_id, member_id)
+
+    def _import_sync(self, rows: List[tuple]):
+        self._conn.executemany(
+            "INSERT INTO warnings (guild_id, member_id, reason, content, created_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    async def import_rows(self, rows: Iterable[tuple]):
+        """Bulk insert ``(guild_id, member_id, reason, content, created_at, expires_at)`` rows."""
+        rows = list(rows)
+        if rows:
+            await self._call(self._import_sync, rows)
+
+    def _sweep_batch_sync(self, now: float, batch: int) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM warnings WHERE id IN (SELECT id FROM warnings WHERE expires_at <= ? LIMIT ?)",
+            (now, batch),
+        )
+        self._conn.commit()
+        return cursor.rowcount
+
+    async def sweep(self, batch: int = 500, now: Optional[float] = None) -> int:
+        """Delete expired warnings ``batch`` rows at a time; returns how many went.
+
+        The lock is released between batches so live warnings never wait on a long purge.
+        """
+        now = time.time() if now is None else now
+        total = 0
+        while True:
+            deleted = await self._call(self._sweep_batch_sync, now, batch)
+            total += deleted
+            if deleted < batch:
+                return total
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,95 @@
+"""Throughput benchmark for AutoMod's blocked word matcher.
+
+Matches synthetic chat messages against the shipped blocked_words.txt and against
+generated term lists of increasing size, and compares the compiled matcher with the
+old approach (tokenise, then test each token against a plain list).
+
+    python benchmarks/automod_bench.py
+    python benchmarks/automod_bench.py --terms 10000,50000 --messages 20000 --hit-rate 0.01
+"""
+import argparse
+import json
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from automod.matcher import BlockedWordMatcher  # noqa: E402
+
+BLOCKED_WORDS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automod", "blocked_words.txt")
+VOCABULARY = [
+    "the", "a", "is", "was", "that", "this", "night", "class", "game", "server", "when", "what", "lol",
+    "anyone", "playing", "tonight", "yeah", "no", "i", "think", "so", "we", "should", "raid", "later",
+    "hello", "thanks", "good", "morning", "bro", "link", "voice", "chat", "join", "mods", "please",
+]
+
+
+def make_terms(n, rng, phrase_share=0.15):
+    terms = set()
+    while len(terms) < n:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+        if rng.random() < phrase_share:
+            word += " " + "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 7)))
+        terms.add(word)
+    return sorted(terms)
+
+
+def make_messages(n, terms, rng, hit_rate):
+    messages = []
+    for _ in range(n):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(3, 25))]
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        messages.append(" ".join(words) + rng.choice(["", ".", "!", "?", " :)"]))
+    return messages
+
+
+def old_match(blocked_words, content):
+    words = re.findall(r"\b\w+\b", content.lower())
+    return next((word for word in words if word in blocked_words), None)
+
+
+def rate(fn, messages, budget):
+    """Messages per second, stopping after ``budget`` seconds on slow matchers."""
+    start = time.perf_counter()
+    done = 0
+    for content in messages:
+        fn(content)
+        done += 1
+        if done % 100 == 0 and time.perf_counter() - start > budget:
+            break
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--terms", default="10000,50000", help="comma-separated generated term list sizes")
+    parser.add_argument("--messages", type=int, default=20000, help="messages matched per case")
+    parser.add_argument("--hit-rate", type=float, default=0.01, help="share of messages containing a blocked term")
+    parser.add_argument("--budget", type=float, default=5.0, help="seconds before a slow matcher is cut short")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with open(BLOCKED_WORDS, "r", encoding="utf-8") as f:
+        cases = [("blocked_words.txt", [w.lower() for w in json.load(f) if isinstance(w, str)])]
+    cases += [(f"{n} generated", make_terms(n, rng)) for n in (int(x) for x in args.terms.split(","))]
+
+    header = f"{'terms':<20} {'count':>7} {'build (ms)':>11} {'old msg/s':>11} {'new msg/s':>11}"
+    print(header)
+    print("-" * len(header))
+    for name, terms in cases:
+        messages = make_messages(args.messages, terms, rng, args.hit_rate)
+        start = time.perf_counter()
+        matcher = BlockedWordMatcher(terms)
+        build = (time.perf_counter() - start) * 1000
+        old = rate(lambda content: old_match(terms, content), messages, args.budget)
+        new = rate(matcher.match, messages, args.budget)
+        print(f"{name:<20} {len(terms):>7} {build:>11.1f} {old:>11.0f} {new:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
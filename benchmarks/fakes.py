@@ -0,0 +1,146 @@
+"""In-process stand-ins for discord.Guild and Red used by the benchmarks.
+
+They implement just the surface the cogs touch, count every call that would have
+been a REST request, and can add artificial latency and 429s to each one.
+"""
+import asyncio
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import discord
+
+BANS_PAGE_SIZE = 1000  # what Discord returns per GET /guilds/{id}/bans page
+
+
+class FakeResponse:
+    status = 429
+    reason = "Too Many Requests"
+
+
+class FakeRateLimited(discord.HTTPException):
+    def __init__(self, retry_after: float):
+        super().__init__(FakeResponse(), "You are being rate limited.")
+        self.retry_after = retry_after
+
+
+class RestStats:
+    """Shared REST call counter, keyed by route name."""
+
+    def __init__(self, latency: float = 0.0, rate_limit: float = 0.0, retry_after: float = 0.01, seed: int = 0):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.calls = Counter()
+        self._random = random.Random(seed)
+
+    async def request(self, route: str, can_429: bool = True):
+        self.calls[route] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if can_429 and self.rate_limit and self._random.random() < self.rate_limit:
+            raise FakeRateLimited(self.retry_after)
+
+    @property
+    def total(self) -> int:
+        return sum(self.calls.values())
+
+    def reset(self):
+        self.calls.clear()
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int, banned_ids, rest: RestStats):
+        self.id = guild_id
+        self.name = f"Guild {guild_id}"
+        self.rest = rest
+        self._bans = set(banned_ids)
+        self._entries = None
+        self._dirty = True
+        self._ban_entries()
+        self.members = {}
+
+    def _ban_entries(self):
+        # Built once per ban-list version so the fake's own cost stays out of the numbers.
+        if self._dirty:
+            self._dirty = False
+            self._entries = [SimpleNamespace(user=SimpleNamespace(id=user_id), reason=None) for user_id in sorted(self._bans)]
+        return self._entries
+
+    async def bans(self, limit=None, **kwargs):
+        entries = self._ban_entries()
+        for start in range(0, len(entries), BANS_PAGE_SIZE):
+            await self.rest.request("GET bans", can_429=False)
+            for entry in entries[start:start + BANS_PAGE_SIZE]:
+                yield entry
+        if not entries:
+            await self.rest.request("GET bans", can_429=False)
+
+    async def fetch_ban(self, user):
+        await self.rest.request("GET ban", can_429=False)
+        if user.id not in self._bans:
+            raise discord.NotFound(SimpleNamespace(status=404, reason="Not Found"), "Unknown Ban")
+        return SimpleNamespace(user=SimpleNamespace(id=user.id), reason=None)
+
+    async def ban(self, user, reason=None, **kwargs):
+        await self.rest.request("PUT ban")
+        self._bans.add(user.id)
+        self._dirty = True
+
+    async def unban(self, user, reason=None):
+        await self.rest.request("DELETE ban")
+        self._bans.discard(user.id)
+        self._dirty = True
+
+    async def bulk_ban(self, users, reason=None, **kwargs):
+        await self.rest.request("POST bulk-ban")
+        users = list(users)
+        self._bans.update(u.id for u in users)
+        self._dirty = True
+        return SimpleNamespace(banned=users, failed=[])
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeRed:
+    def __init__(self, guilds):
+        self.guilds = list(guilds)
+        self._guilds = {g.id: g for g in self.guilds}
+        self.tree = SimpleNamespace(sync=self._noop)
+        self.users = {}
+
+    async def _noop(self, *args, **kwargs):
+        return None
+
+    async def wait_until_ready(self):
+        return None
+
+    def is_closed(self):
+        return False
+
+    def get_guild(self, guild_id):
+        return self._guilds.get(guild_id)
+
+    def get_channel(self, channel_id):
+        return None
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    async def fetch_user(self, user_id):
+        return self.users.setdefault(user_id, FakeUser(user_id))
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = SimpleNamespace(url="")
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, *args, **kwargs):
+        return None
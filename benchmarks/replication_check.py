@@ -0,0 +1,161 @@
+"""Two-process check for ServerBan's global ban list replication.
+
+Starts a leader and a follower as separate processes on one machine, each with its
+own ban store in a temporary directory, then bans and unbans IDs on either node and
+reports how long each change takes to show up on the other. It also restarts the
+follower and the leader to exercise backlog and snapshot catch-up.
+
+    python benchmarks/replication_check.py
+    python benchmarks/replication_check.py --address unix:/tmp/serverban.sock --rounds 50
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from serverban.banstore import BanStore  # noqa: E402
+from serverban.journal import BanJournal  # noqa: E402
+from serverban.replication import Replicator  # noqa: E402
+
+BASE_ID = 10 ** 17
+
+
+async def run_node(role: str, address: str, workdir: str, token: str):
+    """One node: apply stdin commands locally and print every change it applies."""
+    journal = BanJournal(BanStore(os.path.join(workdir, "bans.bin")), os.path.join(workdir, "bans.journal"))
+    store = journal.load()
+
+    async def apply(op, user_ids, enforce=True):
+        if op == "add":
+            changed = [user_id for user_id in user_ids if user_id not in store]
+            for user_id in changed:
+                store.add(user_id)
+            await journal.add_many(changed)
+        else:
+            changed = [user_id for user_id in user_ids if user_id in store]
+            for user_id in changed:
+                store.discard(user_id)
+            await journal.remove_many(changed)
+        if changed:
+            print(f"applied {op} {','.join(map(str, changed))}", flush=True)
+        return changed
+
+    replicator = Replicator(role, address, store, apply, token=token)
+    await replicator.start()
+    print("ready", flush=True)
+    while True:
+        line = await asyncio.to_thread(sys.stdin.readline)
+        if not line:
+            break
+        op, *args = line.split()
+        if op in ("add", "remove"):
+            replicator.publish(op, await apply(op, [int(arg) for arg in args]))
+        elif op == "count":
+            print(f"count {len(store)} {replicator.connected or replicator.is_leader}", flush=True)
+    await replicator.close()
+    await journal.close()
+
+
+class Node:
+    def __init__(self, role, address, workdir, token):
+        self.role = role
+        self.proc = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--node", role, "--address", address, "--workdir", workdir,
+             "--token", token],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1,
+        )
+        self.expect("ready")
+
+    def send(self, line):
+        self.proc.stdin.write(line + "\n")
+        self.proc.stdin.flush()
+
+    def expect(self, prefix, timeout=10.0):
+        # readline blocks, so the deadline only stops us skipping unrelated output forever.
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise RuntimeError(f"{self.role} exited")
+            if line.startswith(prefix):
+                return line.split()
+        raise TimeoutError(prefix)
+
+    def count(self):
+        while True:
+            self.send("count")
+            _, size, synced = self.expect("count")
+            if synced == "True":
+                return int(size)
+            time.sleep(0.05)
+
+    def stop(self):
+        self.proc.stdin.close()
+        self.proc.wait(timeout=10)
+
+
+def propagate(source, target, op, user_id):
+    start = time.perf_counter()
+    source.send(f"{op} {user_id}")
+    target.expect(f"applied {op} {user_id}")
+    return time.perf_counter() - start
+
+
+def check(args):
+    with tempfile.TemporaryDirectory() as leader_dir, tempfile.TemporaryDirectory() as follower_dir:
+        leader = Node("leader", args.address, leader_dir, args.token)
+        follower = Node("follower", args.address, follower_dir, args.token)
+        follower.count()
+
+        timings = {"leader -> follower": [], "follower -> leader": []}
+        for i in range(args.rounds):
+            timings["leader -> follower"].append(propagate(leader, follower, "add", BASE_ID + i))
+            timings["follower -> leader"].append(propagate(follower, leader, "add", BASE_ID + args.rounds + i))
+        for i in range(0, args.rounds, 2):
+            timings["leader -> follower"].append(propagate(leader, follower, "remove", BASE_ID + i))
+
+        print(f"{'direction':<20} {'changes':>8} {'median ms':>10} {'max ms':>8}")
+        for direction, values in timings.items():
+            print(f"{direction:<20} {len(values):>8} {statistics.median(values) * 1000:>10.2f} {max(values) * 1000:>8.2f}")
+
+        # Backlog catch-up: changes made while the follower is down.
+        follower.stop()
+        leader.send("add " + " ".join(str(BASE_ID + 10 * args.rounds + i) for i in range(args.bulk)))
+        follower = Node("follower", args.address, follower_dir, args.token)
+        print(f"follower restart:  leader {leader.count()} IDs, follower {follower.count()} IDs")
+
+        # Snapshot catch-up: a restarted leader has a new epoch and an empty backlog.
+        leader.stop()
+        leader = Node("leader", args.address, leader_dir, args.token)
+        leader.send(f"add {BASE_ID - 1}")
+        follower.expect(f"applied add {BASE_ID - 1}")
+        print(f"leader restart:    leader {leader.count()} IDs, follower {follower.count()} IDs")
+
+        follower.stop()
+        leader.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--address", default="127.0.0.1:8765", help="host:port or unix:/path for the leader")
+    parser.add_argument("--rounds", type=int, default=20, help="bans issued on each node")
+    parser.add_argument("--bulk", type=int, default=1000, help="IDs added while the follower is down")
+    parser.add_argument("--node", choices=("leader", "follower"), help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--token", default=secrets.token_hex(16), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.node:
+        asyncio.run(run_node(args.node, args.address, args.workdir, args.token))
+    else:
+        check(args)
+
+
+if __name__ == "__main__":
+    main()
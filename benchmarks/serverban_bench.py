@@ -0,0 +1,103 @@
+"""Offline benchmark for ServerBan's global paths.
+
+Runs the ban index warm-up, ``do_global_ban`` and the scheduled sync pass against
+fake guilds and reports wall time, REST calls and the peak traced memory each phase
+allocates. Wall times include tracemalloc's overhead, so compare them run to run
+rather than against production.
+
+    python benchmarks/serverban_bench.py
+    python benchmarks/serverban_bench.py --guilds 10,100 --bans 1000 --latency 0.05 --rate-limit 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fakes import FakeGuild, FakeRed, FakeUser, RestStats  # noqa: E402
+from serverban.banstore import write_sorted_ids  # noqa: E402
+from serverban import serverban as serverban_module  # noqa: E402
+
+BASE_ID = 10 ** 17
+
+
+async def measure(name, rest, coro, rows, case):
+    rest.reset()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    # Peak above what was already allocated (fakes included) when the phase started.
+    rows.append((case, name, elapsed, rest.total, (peak - baseline) / (1024 * 1024)))
+
+
+async def run_case(n_guilds, n_bans, args, rows):
+    case = f"{n_guilds} guilds x {n_bans} bans"
+    global_ids = list(range(BASE_ID, BASE_ID + n_bans))
+    # Every guild already has the global list except for the last few IDs.
+    guild_bans = global_ids[:max(0, n_bans - args.missing)]
+
+    rest = RestStats(latency=args.latency, rate_limit=args.rate_limit)
+    guilds = [FakeGuild(1000 + i, guild_bans, rest) for i in range(n_guilds)]
+    bot = FakeRed(guilds)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            write_sorted_ids(serverban_module.BANSTORE_FILE, global_ids)
+            cog = serverban_module.ServerBan(bot)
+            cog.fanout.concurrency = args.concurrency
+            moderator = FakeUser(1)
+
+            await measure("warm index", rest, cog._warm_ban_index(), rows, case)
+            await measure("do_global_ban", rest, cog.do_global_ban(FakeUser(BASE_ID - 1), moderator, "bench", None), rows, case)
+            await measure("sync pass (cold)", rest, cog.sync_pass(), rows, case)
+            await measure("sync pass (steady)", rest, cog.sync_pass(), rows, case)
+            await cog.journal.close()
+        finally:
+            os.chdir(cwd)
+
+
+def print_rows(rows):
+    header = f"{'case':<28} {'phase':<20} {'wall (s)':>10} {'REST calls':>11} {'peak +MiB':>10}"
+    print(header)
+    print("-" * len(header))
+    for case, name, elapsed, calls, peak in rows:
+        print(f"{case:<28} {name:<20} {elapsed:>10.3f} {calls:>11} {peak:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--guilds", default="10,100,1000", help="comma-separated guild counts")
+    parser.add_argument("--bans", default="1000,100000", help="comma-separated ban list sizes")
+    parser.add_argument("--missing", type=int, default=10, help="global IDs each guild is missing before the sync pass")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every fake REST call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability that a write returns a 429")
+    parser.add_argument("--concurrency", type=int, default=8, help="FanOut concurrency")
+    parser.add_argument(
+        "--max-entries", type=int, default=20_000_000,
+        help="skip cases where guilds x bans exceeds this (the index holds every guild's bans)",
+    )
+    args = parser.parse_args()
+
+    rows = []
+    tracemalloc.start()
+    for n_guilds in (int(x) for x in args.guilds.split(",")):
+        for n_bans in (int(x) for x in args.bans.split(",")):
+            if n_guilds * n_bans > args.max_entries:
+                print(f"skipping {n_guilds} guilds x {n_bans} bans (over --max-entries)", file=sys.stderr)
+                continue
+            asyncio.run(run_case(n_guilds, n_bans, args, rows))
+    tracemalloc.stop()
+    print_rows(rows)
+
+
+if __name__ == "__main__":
+    main()
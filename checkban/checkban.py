@@ -1,13 +1,63 @@
 import discord
 from redbot.core import commands, app_commands
 from redbot.core.bot import Red
-from typing import Union
+from typing import Dict, Optional, Union
+import asyncio
+import io
+import re
+import time
+
+LOOKUP_CONCURRENCY = 10  # guilds looked up at once
+PROGRESS_INTERVAL = 1.5  # seconds between progress edits
+MESSAGE_LIMIT = 2000
+SNAPSHOT_TTL = 300  # seconds a guild's ban snapshot answers checks without REST calls
+MAX_BATCH_IDS = 1000
+MAX_ATTACHMENT_SIZE = 1024 * 1024
+ID_PATTERN = re.compile(r"\d{15,20}")
 
 class CheckBan(commands.Cog):
     """Check if a user is banned in any server the bot is in."""
 
     def __init__(self, bot: Red):
         self.bot = bot
+        self.ban_snapshots: Dict[int, tuple] = {}  # guild_id -> (expires_at, {user_id: reason})
+        self._snapshot_locks: Dict[int, asyncio.Lock] = {}
+
+    def cached_bans(self, guild: discord.Guild) -> Optional[dict]:
+        snapshot = self.ban_snapshots.get(guild.id)
+        if snapshot is None or snapshot[0] < time.monotonic():
+            return None
+        return snapshot[1]
+
+    async def ban_snapshot(self, guild: discord.Guild, semaphore: asyncio.Semaphore) -> Optional[dict]:
+        """Return ``{user_id: reason}`` for every ban in ``guild``, reusing it for SNAPSHOT_TTL.
+
+        Returns None if the bot can't read the guild's bans.
+        """
+        lock = self._snapshot_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            bans = self.cached_bans(guild)
+            if bans is not None:
+                return bans
+            async with semaphore:
+                try:
+                    bans = {ban_entry.user.id: ban_entry.reason async for ban_entry in guild.bans(limit=None)}
+                except discord.HTTPException:
+                    return None
+            self.ban_snapshots[guild.id] = (time.monotonic() + SNAPSHOT_TTL, bans)
+            return bans
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        bans = self.cached_bans(guild)
+        if bans is not None:
+            bans[user.id] = None  # the reason isn't in the event; shown as "No reason provided"
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        bans = self.cached_bans(guild)
+        if bans is not None:
+            bans.pop(user.id, None)
 
     async def has_team_role(self, interaction: discord.Interaction) -> bool:
         role_name = "KCN | Team"
@@ -21,6 +71,44 @@ class CheckBan(commands.Cog):
         role = discord.utils.get(member.roles, name=role_name)
         return role is not None
 
+    async def lookup_ban(self, guild: discord.Guild, user, semaphore: asyncio.Semaphore):
+        """Return ``(guild name, reason)`` if ``user`` is banned in ``guild``, else None.
+
+        Guilds whose bans the bot may not read count as not banning the user; any
+        other HTTP error is raised so the caller can report the guild as unchecked.
+        """
+        bans = self.cached_bans(guild)
+        if bans is not None:
+            return (guild.name, bans[user.id]) if user.id in bans else None
+        async with semaphore:
+            try:
+                ban_entry = await guild.fetch_ban(user)
+            except discord.NotFound:
+                return None
+            except discord.Forbidden:
+                return None  # bot can't access bans in this guild
+        return guild.name, ban_entry.reason
+
+    def format_result(self, user, banned_servers, done: int, total: int, unreadable: list = ()) -> str:
+        if banned_servers:
+            msg = f"**{user}** is banned in the following server(s):\n"
+            for guild_name, reason in banned_servers:
+                reason_text = reason if reason else "No reason provided"
+                msg += f"- {guild_name}: {reason_text}\n"
+        elif done == total and not unreadable:
+            msg = f"**{user}** is not banned in any servers I can check."
+        elif done == total:
+            msg = f"**{user}** is not banned in any server I could read.\n"
+        else:
+            msg = f"**{user}** is not banned in any server checked so far.\n"
+        if unreadable:
+            msg += f"\nCouldn't read bans in: {', '.join(unreadable)}\n"
+        if done < total:
+            msg += f"\n_Checked {done}/{total} servers..._"
+        if len(msg) > MESSAGE_LIMIT:
+            msg = msg[:MESSAGE_LIMIT - 2] + "\n…"
+        return msg
+
     @app_commands.command(name="checkban", description="Check if a user is banned in any server the bot is in.")
     @app_commands.describe(user="The user to check (mention or ID)")
     async def checkban(
@@ -33,22 +121,102 @@ class CheckBan(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)  # ✅ prevents 3s timeout
 
-        banned_servers = []
+        # One GET per guild for this user instead of paging through every guild's bans.
+        guilds = list(self.bot.guilds)
+        total = len(guilds)
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+        unreadable = []
 
-        for guild in self.bot.guilds:
+        async def lookup(guild):
             try:
-                async for ban_entry in guild.bans():  # ✅ proper usage
-                    if ban_entry.user.id == user.id:
-                        banned_servers.append((guild.name, ban_entry.reason))
-            except discord.Forbidden:
-                continue  # bot can't access bans in this guild
+                return await self.lookup_ban(guild, user, semaphore)
+            except discord.HTTPException:
+                unreadable.append(guild.name)
+                return None
 
-        if banned_servers:
-            msg = f"**{user}** is banned in the following server(s):\n"
-            for guild_name, reason in banned_servers:
-                reason_text = reason if reason else "No reason provided"
-                msg += f"- {guild_name}: {reason_text}\n"
-        else:
-            msg = f"**{user}** is not banned in any servers I can check."
+        message = await interaction.followup.send(self.format_result(user, [], 0, total), ephemeral=True, wait=True)
+        banned_servers = []
+        done = 0
+        last_edit = time.monotonic()
+        for result in asyncio.as_completed([lookup(guild) for guild in guilds]):
+            result = await result
+            done += 1
+            if result is not None:
+                banned_servers.append(result)
+            if done < total and time.monotonic() - last_edit >= PROGRESS_INTERVAL:
+                last_edit = time.monotonic()
+                await message.edit(content=self.format_result(user, banned_servers, done, total, unreadable))
+
+        await message.edit(content=self.format_result(user, banned_servers, total, total, unreadable))
+
+    async def read_batch_ids(self, ids: Optional[str], file: Optional[discord.Attachment]) -> list:
+        text = ids or ""
+        if file is not None:
+            if file.size > MAX_ATTACHMENT_SIZE:
+                raise ValueError("The attachment is larger than 1 MB.")
+            text += "\n" + (await file.read()).decode("utf-8", errors="ignore")
+        return list(dict.fromkeys(int(match) for match in ID_PATTERN.findall(text)))
+
+    def format_matrix(self, user_ids: list, guilds: list, snapshots: list) -> str:
+        """One row per banned user, one column per guild that bans any of them."""
+        columns = [
+            (guild, bans) for guild, bans in zip(guilds, snapshots)
+            if bans is not None and any(user_id in bans for user_id in user_ids)
+        ]
+        unreadable = [guild for guild, bans in zip(guilds, snapshots) if bans is None]
+        banned_rows = []
+        for user_id in user_ids:
+            cells = ["X" if user_id in bans else "." for _, bans in columns]
+            if "X" in cells:
+                banned_rows.append(f"{user_id:<20} {' '.join(f'{cell:>3}' for cell in cells)}  {cells.count('X')}")
 
-        await interaction.followup.send(msg, ephemeral=True)  # ✅ now we edit response properly
+        lines = [f"{len(banned_rows)}/{len(user_ids)} users banned in at least one of {len(guilds)} servers."]
+        if unreadable:
+            lines.append(f"Couldn't read bans in: {', '.join(guild.name for guild in unreadable)}")
+        if banned_rows:
+            lines.append("")
+            lines.extend(f"{i:>3} = {guild.name}" for i, (guild, _) in enumerate(columns, 1))
+            lines.append("")
+            lines.append(f"{'user':<20} {' '.join(f'{i:>3}' for i in range(1, len(columns) + 1))}  total")
+            lines.extend(banned_rows)
+        return "\n".join(lines)
+
+    @app_commands.command(name="checkbanbatch", description="Check many user IDs against every server's bans at once.")
+    @app_commands.describe(
+        ids="User IDs separated by spaces, commas or new lines",
+        file="A text file containing user IDs"
+    )
+    async def checkbanbatch(
+        self,
+        interaction: discord.Interaction,
+        ids: Optional[str] = None,
+        file: Optional[discord.Attachment] = None
+    ):
+        if not await self.has_team_role(interaction):
+            return await interaction.response.send_message("Authorised role not found", ephemeral=True)
+
+        await interaction.response.defer(ephemeral=True)
+        try:
+            user_ids = await self.read_batch_ids(ids, file)
+        except (ValueError, discord.HTTPException) as e:
+            return await interaction.followup.send(f"Couldn't read the IDs: {e}", ephemeral=True)
+        if not user_ids:
+            return await interaction.followup.send("No user IDs found.", ephemeral=True)
+        if len(user_ids) > MAX_BATCH_IDS:
+            return await interaction.followup.send(f"Too many IDs; the limit is {MAX_BATCH_IDS}.", ephemeral=True)
+
+        # One pass over each guild's bans answers every ID; snapshots are reused for a few minutes.
+        guilds = list(self.bot.guilds)
+        semaphore = asyncio.Semaphore(LOOKUP_CONCURRENCY)
+        snapshots = await asyncio.gather(*(self.ban_snapshot(guild, semaphore) for guild in guilds))
+
+        report = self.format_matrix(user_ids, guilds, snapshots)
+        if len(report) + 8 <= MESSAGE_LIMIT:
+            await interaction.followup.send(f"```\n{report}\n```", ephemeral=True)
+        else:
+            buf = io.BytesIO(report.encode("utf-8"))
+            await interaction.followup.send(
+                "The result is too long for a message; here it is as a file.",
+                file=discord.File(buf, filename="checkban.txt"),
+                ephemeral=True
+            )
@@ -1,52 +1,208 @@
 import discord
 from redbot.core import commands, Config
 import asyncio
+import csv
+import gzip
+import io
+import json
 import logging
 
 log = logging.getLogger("red.globalban")
 
+UPDATE_INTERVAL = 21600  # 6 hours; ban events keep the list current in between
+SYNC_INTERVAL = 43200  # 12 hours; only bans what each guild is missing
+UPDATE_CONCURRENCY = 8  # default number of guilds the update reads at once
+EXPORT_FORMATS = {"plain": "txt", "csv": "csv", "ndjson": "ndjson"}  # format -> file extension
+INLINE_LIST_MAX = 50  # plain lists up to this size may still fit in a message
+BAN_GROUP = "GLOBAL_BANS"  # Config custom group holding one entry per banned user ID
+
 class GlobalBan(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.config = Config.get_conf(self, identifier=1234567890, force_registration=True)
-        self.config.register_global(ban_list={})
+        # ban_list is the old single-blob storage, only read to migrate it into BAN_GROUP.
+        self.config.register_global(ban_list={}, update_concurrency=UPDATE_CONCURRENCY)
+        self.config.init_custom(BAN_GROUP, 1)
+        self.config.register_custom(BAN_GROUP, reason="No reason provided", banned_by="Unknown")
+        self._ban_cache = None  # user_id (str) -> entry, loaded on first use
+        self._ban_cache_lock = asyncio.Lock()
+        self._rebuild_additions = []  # one dict per running update_ban_list, of entries added meanwhile
+        self.guild_bans = {}  # guild_id -> set of banned user IDs, kept current by ban events
+        self._guild_ban_locks = {}
+        self.list_version = 0  # bumped whenever ban_list gains entries
+        self.synced_versions = {}  # guild_id -> list_version the guild last had every ban for
+        self.propagation_queue = asyncio.Queue()
+        self.propagation_task = self.bot.loop.create_task(self.propagation_worker())
         self.ban_update_task = self.bot.loop.create_task(self.ban_update_loop())
         self.ban_sync_task = self.bot.loop.create_task(self.ban_sync_loop())
-    
+
+    def cog_unload(self):
+        for task in (self.propagation_task, self.ban_update_task, self.ban_sync_task):
+            task.cancel()
+
     async def ban_update_loop(self):
         await self.bot.wait_until_ready()
         while True:
             log.info("Starting 6-hour global ban list update...")
-            await self.globalbanupdatelist(None)
+            await self.update_ban_list()
             log.info("Global ban list update complete. Next update in 6 hours.")
-            await asyncio.sleep(21600)  # 6 hours
-    
+            await asyncio.sleep(UPDATE_INTERVAL)
+
     async def ban_sync_loop(self):
         await self.bot.wait_until_ready()
         while True:
             log.info("Starting 12-hour global ban sync...")
             await self.sync_bans()
             log.info("Global ban sync complete. Next sync in 12 hours.")
-            await asyncio.sleep(43200)  # 12 hours
-    
-    async def sync_bans(self):
-        ban_list = await self.config.ban_list()
+            await asyncio.sleep(SYNC_INTERVAL)
+
+    async def get_ban_list(self):
+        """Return the global ban list as ``{user_id: {"reason", "banned_by"}}``.
+
+        Served from memory after the first call; callers must not modify it.
+        """
+        if self._ban_cache is None:
+            async with self._ban_cache_lock:
+                if self._ban_cache is None:
+                    bans = await self.config.custom(BAN_GROUP).all()
+                    legacy = await self.config.ban_list()
+                    if legacy and not bans:
+                        await self.config.custom(BAN_GROUP).set(legacy)
+                        await self.config.ban_list.clear()
+                        bans = legacy
+                        log.info(f"Moved {len(bans)} global bans to per-user storage.")
+                    self._ban_cache = bans
+        return self._ban_cache
+
+    async def add_ban(self, user_id, reason, banned_by):
+        """Store one entry; a single small write however long the list is."""
+        entry = {"reason": reason, "banned_by": banned_by}
+        (await self.get_ban_list())[str(user_id)] = entry
+        for additions in self._rebuild_additions:
+            additions[str(user_id)] = entry
+        await self.config.custom(BAN_GROUP, str(user_id)).set(entry)
+
+    async def replace_ban_list(self, bans):
+        await self.get_ban_list()
+        self._ban_cache = bans
+        await self.config.custom(BAN_GROUP).set(bans)
+
+    def list_changed(self):
+        """Record that ban_list gained entries; returns the new version."""
+        self.list_version += 1
+        return self.list_version
+
+    async def guild_ban_set(self, guild, refresh=False):
+        """Return the IDs banned in ``guild``, fetching them the first time or when ``refresh`` is set."""
+        lock = self._guild_ban_locks.setdefault(guild.id, asyncio.Lock())
+        async with lock:
+            if refresh or guild.id not in self.guild_bans:
+                self.guild_bans[guild.id] = {ban_entry.user.id async for ban_entry in guild.bans(limit=None)}
+        return self.guild_bans[guild.id]
+
+    async def ban_missing(self, guild, user_ids, reason, refresh=False):
+        """Ban whichever of ``user_ids`` aren't banned in ``guild`` yet.
+
+        Returns ``(banned, failed)``; a guild is only fully synced when ``failed`` is 0.
+        """
+        banned = await self.guild_ban_set(guild, refresh=refresh)
+        missing = [user_id for user_id in user_ids if user_id not in banned]
+        count = failed = 0
+        for i, user_id in enumerate(missing):
+            try:
+                await guild.ban(discord.Object(id=user_id), reason=reason)
+            except discord.Forbidden:
+                log.warning(f"No permission to ban in {guild.name}")
+                failed += len(missing) - i
+                break
+            except discord.HTTPException as e:
+                log.error(f"Error banning {user_id} in {guild.name}: {e}")
+                failed += 1
+                continue
+            banned.add(user_id)
+            count += 1
+        return count, failed
+
+    async def propagate_ban(self, user_id, reason, version=None):
+        """Ban ``user_id`` in every guild that doesn't have the ban yet.
+
+        ``version`` is the list version that added ``user_id``; guilds that were synced
+        right up to the version before it and now have the ban move up to it.
+        """
         for guild in self.bot.guilds:
-            log.info(f"Syncing bans for {guild.name}...")
-            count = 0
-            for user_id in ban_list.keys():
-                user = discord.Object(id=int(user_id))
-                try:
-                    await guild.ban(user, reason="Global ban sync")
-                    count += 1
-                    if count % 20 == 0:
-                        log.info(f"{count} bans synced in {guild.name}")
-                    await asyncio.sleep(0.5)  # Prevent rate limits
-                except discord.Forbidden:
-                    log.warning(f"No permission to ban in {guild.name}")
-                except discord.HTTPException as e:
-                    log.error(f"Error banning in {guild.name}: {e}")
-            log.info(f"All bans synced in {guild.name} ({count} total).")
+            try:
+                _, failed = await self.ban_missing(guild, [user_id], f"Global ban: {reason}")
+            except discord.HTTPException as e:
+                log.error(f"Error fetching bans from {guild.name}: {e}")
+                continue
+            if version is not None and not failed and self.synced_versions.get(guild.id) == version - 1:
+                self.synced_versions[guild.id] = version
+
+    async def propagation_worker(self):
+        await self.bot.wait_until_ready()
+        while True:
+            user_id, reason, version = await self.propagation_queue.get()
+            try:
+                await self.propagate_ban(user_id, reason, version)
+            except Exception:
+                log.exception(f"Failed to propagate the global ban of {user_id}")
+            finally:
+                self.propagation_queue.task_done()
+
+    async def sync_bans(self):
+        """Ban the missing part of the global list in every guild that isn't known to be in sync.
+
+        A guild whose watermark matches the current list version is skipped without
+        any REST calls. Otherwise its bans are fetched once and only the difference is
+        banned.
+        """
+        version = self.list_version
+        stale = [guild for guild in self.bot.guilds if self.synced_versions.get(guild.id) != version]
+        if not stale:
+            return
+        user_ids = [int(user_id) for user_id in await self.get_ban_list()]
+        for guild in stale:
+            try:
+                count, failed = await self.ban_missing(guild, user_ids, "Global ban sync", refresh=True)
+            except discord.HTTPException as e:
+                log.error(f"Error fetching bans from {guild.name}: {e}")
+                continue
+            if not failed:
+                self.synced_versions[guild.id] = version
+            if count or failed:
+                log.info(f"Synced {count} missing bans in {guild.name} ({failed} failed).")
+
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild, user):
+        banned = self.guild_bans.get(guild.id)
+        if banned is not None:
+            banned.add(user.id)
+        if str(user.id) in await self.get_ban_list():
+            # Already global; this is usually our own propagation landing.
+            return
+
+        try:
+            ban_entry = await guild.fetch_ban(user)
+            reason = ban_entry.reason or "No reason provided"
+        except discord.HTTPException:
+            reason = "No reason provided"
+        await self.add_ban(user.id, reason, "Unknown")
+        log.info(f"{user} banned in {guild.name}; added to the global list and queued for propagation.")
+        self.propagation_queue.put_nowait((user.id, reason, self.list_changed()))
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild, user):
+        banned = self.guild_bans.get(guild.id)
+        if banned is not None:
+            banned.discard(user.id)
+        if str(user.id) in await self.get_ban_list():
+            # The guild no longer has every global ban; the next sync has to look at it.
+            self.synced_versions.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.guild_bans.pop(guild.id, None)
+        self.synced_versions.pop(guild.id, None)
 
     @commands.command()
     async def bansync(self, ctx):
@@ -57,25 +213,60 @@ class GlobalBan(commands.Cog):
     @commands.command()
     async def globaltotalbans(self, ctx):
         """Show total number of globally banned users."""
-        ban_list = await self.config.ban_list()
+        ban_list = await self.get_ban_list()
         await ctx.send(f"{len(ban_list)} users have been globally banned.")
     
+    def build_export(self, entries, fmt, compress):
+        """Write ``entries`` in ``fmt`` into an in-memory buffer; runs in a worker thread."""
+        buf = io.BytesIO()
+        raw = gzip.GzipFile(fileobj=buf, mode="wb") if compress else buf
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        if fmt == "csv":
+            writer = csv.writer(text)
+            writer.writerow(["user_id", "reason", "banned_by"])
+            writer.writerows((uid, data.get("reason"), data.get("banned_by")) for uid, data in entries)
+        elif fmt == "ndjson":
+            for uid, data in entries:
+                text.write(json.dumps({"user_id": int(uid), "reason": data.get("reason"), "banned_by": data.get("banned_by")}))
+                text.write("\n")
+        else:
+            for uid, data in entries:
+                text.write(f"{uid}: {data.get('reason')}\n")
+        text.flush()
+        text.detach()
+        if compress:
+            raw.close()
+        buf.seek(0)
+        return buf
+
     @commands.command()
-    async def globalbanlist(self, ctx):
-        """Send the global ban list."""
-        ban_list = await self.config.ban_list()
+    async def globalbanlist(self, ctx, fmt: str = "plain", compress: bool = False):
+        """Send the global ban list.
+
+        Formats: plain, csv or ndjson (one JSON object per line, with reasons).
+        Pass `True` after the format to gzip the file.
+        """
+        fmt = fmt.lower()
+        if fmt not in EXPORT_FORMATS:
+            await ctx.send(f"Unknown format. Use one of: {', '.join(EXPORT_FORMATS)}.")
+            return
+        ban_list = await self.get_ban_list()
         if not ban_list:
             await ctx.send("The global ban list is empty.")
             return
-        
-        content = "\n".join([f"{uid}: {data['reason']}" for uid, data in ban_list.items()])
-        if len(content) > 1500:
-            with open("globalbanlist.txt", "w") as f:
-                f.write(content)
-            await ctx.send("Global ban list is too large. Sending as a file.", file=discord.File("globalbanlist.txt"))
-        else:
-            await ctx.send(f"```{content}```")
-    
+
+        if fmt == "plain" and not compress and len(ban_list) <= INLINE_LIST_MAX:
+            content = "\n".join([f"{uid}: {data['reason']}" for uid, data in ban_list.items()])
+            if len(content) <= 1500:
+                await ctx.send(f"```{content}```")
+                return
+
+        # Snapshot the entries so bans landing meanwhile can't change the dict under the thread.
+        entries = list(ban_list.items())
+        buf = await asyncio.to_thread(self.build_export, entries, fmt, compress)
+        filename = f"globalbanlist.{EXPORT_FORMATS[fmt]}" + (".gz" if compress else "")
+        await ctx.send(f"Global ban list ({len(entries)} entries).", file=discord.File(buf, filename=filename))
+
     @commands.command()
     async def globalbanlistwipe(self, ctx):
         """Wipe the entire global ban list."""
@@ -91,61 +282,89 @@ class GlobalBan(commands.Cog):
             await ctx.send("Wipe request timed out.")
             return
         
-        await self.config.ban_list.set({})
+        await self.replace_ban_list({})
         await ctx.send("Global ban list wiped.")
         log.info("Global ban list has been wiped.")
     
-    @commands.command()
-    async def globalbanupdatelist(self, ctx):
-        """Fetch all bans from all servers and update the global list."""
+    async def update_ban_list(self, ctx=None):
+        """Rebuild ban_list from every guild's bans, reading the guilds concurrently.
+
+        Each guild's bans are folded into the result as they stream in. When two guilds
+        ban the same user, the entry from the guild listed first in ``bot.guilds`` wins,
+        as it did when the guilds were read one after another. Entries added while the
+        update runs (ban events, ``globalban``) are kept even if the guild that would
+        have reported them was read before they landed.
+        """
         log.info("Updating global ban list from the current servers...")
+        semaphore = asyncio.Semaphore(await self.config.update_concurrency())
         banned_users = {}
-        
-        for guild in self.bot.guilds:
-            log.info(f"Fetching bans from the server: {guild.name}")
-            try:
-                count = 0
-                async for ban_entry in guild.bans():
+        source_rank = {}
+        additions = {}
+        self._rebuild_additions.append(additions)
+
+        async def collect(rank, guild):
+            async with semaphore:
+                log.info(f"Fetching bans from the server: {guild.name}")
+                fetched = set()
+                async for ban_entry in guild.bans(limit=None):
+                    fetched.add(ban_entry.user.id)
                     user_id = str(ban_entry.user.id)
-                    if user_id not in banned_users:
+                    if source_rank.get(user_id, rank + 1) > rank:
+                        source_rank[user_id] = rank
                         banned_users[user_id] = {
                             "reason": ban_entry.reason or "No reason provided",
                             "banned_by": "Unknown"
                         }
-                        count += 1
-                        if count % 5 == 0:
-                            log.info(f"Still fetching bans... {count} users added so far from {guild.name}.")
-                    await asyncio.sleep(0.5)  # Prevent rate limits
-                log.info(f"Fetched {len(banned_users)} bans from {guild.name}")
-            except discord.HTTPException as e:
-                log.error(f"Error fetching bans from {guild.name}: {e}")
-                if ctx:
-                    await ctx.send(f"An error occurred while fetching bans from {guild.name}.")
-        
-        await self.config.ban_list.set(banned_users)
+                self.guild_bans[guild.id] = fetched
+                log.info(f"Fetched {len(fetched)} bans from {guild.name}")
+
+        guilds = list(self.bot.guilds)
+        try:
+            results = await asyncio.gather(*(collect(rank, guild) for rank, guild in enumerate(guilds)), return_exceptions=True)
+            for guild, result in zip(guilds, results):
+                if isinstance(result, discord.HTTPException):
+                    log.error(f"Error fetching bans from {guild.name}: {result}")
+                    if ctx:
+                        await ctx.send(f"An error occurred while fetching bans from {guild.name}.")
+                elif isinstance(result, BaseException):
+                    raise result
+            previous = await self.get_ban_list()
+        finally:
+            self._rebuild_additions.remove(additions)
+        # Nothing awaits between here and the cache swap, so no addition can slip through.
+        banned_users.update(additions)
+        await self.replace_ban_list(banned_users)
+        if not banned_users.keys() <= previous.keys():
+            self.list_changed()
         log.info(f"All fetched, list updated. Total bans: {len(banned_users)}")
         if ctx:
             await ctx.send(f"Global ban list updated. {len(banned_users)} bans recorded.")
-    
+
+    @commands.command()
+    async def globalbanupdatelist(self, ctx):
+        """Fetch all bans from all servers and update the global list."""
+        await self.update_ban_list(ctx)
+
+    @commands.command()
+    async def globalbanconcurrency(self, ctx, guilds: int):
+        """Set how many servers the ban list update reads at once."""
+        if guilds < 1:
+            await ctx.send("Concurrency must be at least 1.")
+            return
+        await self.config.update_concurrency.set(guilds)
+        await ctx.send(f"The ban list update now reads {guilds} servers at once.")
+
     @commands.command()
     async def globalban(self, ctx, user: discord.User, *, reason="No reason provided"):
         """Ban a user globally"""
-        ban_list = await self.config.ban_list()
-        if str(user.id) in ban_list:
+        if str(user.id) in await self.get_ban_list():
             await ctx.send("User is already globally banned.")
             return
-        
-        ban_list[str(user.id)] = {"reason": reason, "banned_by": ctx.author.id}
-        await self.config.ban_list.set(ban_list)
-        
-        for guild in self.bot.guilds:
-            try:
-                await guild.ban(user, reason=f"Global ban: {reason}")
-            except discord.Forbidden:
-                log.warning(f"No permission to ban {user} in {guild.name}")
-            except discord.HTTPException as e:
-                log.error(f"Failed to ban {user} in {guild.name}: {e}")
-        
+
+        await self.add_ban(user.id, reason, ctx.author.id)
+
+        await self.propagate_ban(user.id, reason, self.list_changed())
+
         await ctx.send(f"{user} has been globally banned.")
         log.info(f"{user} globally banned by {ctx.author} for: {reason}")
 
@@ -0,0 +1,232 @@
+import asyncio
+import collections.abc
+import heapq
+import itertools
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+ITEM_SIZE = array("q").itemsize
+MAX_USER_ID = 2 ** 63 - 1  # largest value an int64 array slot can hold
+
+T = TypeVar("T")
+
+
+def is_valid_id(user_id: int) -> bool:
+    """Whether ``user_id`` is a positive ID that fits the int64 array file."""
+    return 0 < user_id <= MAX_USER_ID
+
+
+def write_sorted_ids(path: str, ids: Iterable[int]):
+    """Atomically write ``ids`` to ``path`` as a sorted, native-endian int64 array."""
+    packed = array("q", sorted(set(ids)))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        packed.tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class BanStore(collections.abc.Set):
+    """Set of user IDs kept as a sorted int64 array on disk plus small in-memory deltas.
+
+    The array file is memory-mapped, so opening it costs nothing no matter how many IDs
+    it holds, and membership is a binary search over the mapping. Recent changes live
+    in ``_added``/``_removed`` until :meth:`merge` folds them into a new array file.
+    Invariant: ``_added`` never overlaps the array and ``_removed`` is a subset of it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        self._base = memoryview(b"").cast("q")
+        self._added = set()
+        self._removed = set()
+        self._merge_ops: Optional[List[Tuple[bool, int]]] = None
+        self._merge_lock = asyncio.Lock()
+
+    @classmethod
+    def _from_iterable(cls, it):
+        # Set operators (``store - other``) return plain sets rather than new stores.
+        return set(it)
+
+    def open(self):
+        self._close_mapping()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._base = memoryview(self._mmap).cast("q")
+
+    def _close_mapping(self):
+        self._base.release()
+        self._base = memoryview(b"").cast("q")
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        self._close_mapping()
+
+    def _in_base(self, user_id: int) -> bool:
+        base = self._base
+        i = bisect_left(base, user_id)
+        return i < len(base) and base[i] == user_id
+
+    def __contains__(self, user_id) -> bool:
+        if user_id in self._added:
+            return True
+        if user_id in self._removed:
+            return False
+        return self._in_base(user_id)
+
+    def __len__(self) -> int:
+        return len(self._base) + len(self._added) - len(self._removed)
+
+    def __iter__(self) -> Iterator[int]:
+        """Yield every ID in ascending order."""
+        removed = self._removed
+        base = (user_id for user_id in self._base if user_id not in removed)
+        return heapq.merge(base, sorted(self._added))
+
+    def rank(self, user_id: int) -> int:
+        """Number of IDs in the set smaller than ``user_id``."""
+        below = bisect_left(self._base, user_id)
+        below -= sum(1 for i in self._removed if i < user_id)
+        below += sum(1 for i in self._added if i < user_id)
+        return below
+
+    def slice(self, start: int, stop: int) -> List[int]:
+        """IDs at sorted positions ``start`` to ``stop``, without walking the ones before."""
+        start = max(start, 0)
+        if start >= stop:
+            return []
+        base = self._base
+        if not self._added and not self._removed:
+            return base[start:stop].tolist()
+
+        added, removed = sorted(self._added), sorted(self._removed)
+
+        def rank(value):
+            return bisect_left(base, value) - bisect_left(removed, value) + bisect_left(added, value)
+
+        # Last array index with at most ``start`` live IDs below it; from there only the
+        # handful of in-memory additions can sit between it and position ``start``.
+        lo, hi = 0, len(base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rank(base[mid]) <= start:
+                lo = mid + 1
+            else:
+                hi = mid
+        i = lo - 1
+        if i < 0:
+            i, skip, added_from = 0, start, 0
+        else:
+            skip = start - rank(base[i])
+            added_from = bisect_left(added, base[i])
+
+        removed_set = self._removed
+        rest = (user_id for user_id in base[i:] if user_id not in removed_set)
+        merged = heapq.merge(rest, added[added_from:])
+        return list(itertools.islice(merged, skip, skip + stop - start))
+
+    async def stream(self, consume: Callable[[Iterator[int]], T]) -> T:
+        """Run ``consume`` over the sorted IDs in a worker thread.
+
+        Merges wait until it returns, so the mapping it reads is never swapped out.
+        """
+        async with self._merge_lock:
+            return await asyncio.to_thread(consume, iter(self))
+
+    async def count_members(self, ids: Iterable[int], on_snapshot: Optional[Callable[[], None]] = None) -> int:
+        """Count how many of ``ids`` are in the set, in a worker thread.
+
+        The count is exact for the set as it stood when ``on_snapshot`` was called;
+        the caller can use that hook to start tracking changes made meanwhile. ``ids``
+        must not change until this returns.
+        """
+        async with self._merge_lock:
+            base, added, removed = self._base, set(self._added), set(self._removed)
+            if on_snapshot is not None:
+                on_snapshot()
+
+            def count():
+                found = 0
+                for user_id in ids:
+                    if user_id in added:
+                        found += 1
+                    elif user_id not in removed:
+                        i = bisect_left(base, user_id)
+                        found += i < len(base) and base[i] == user_id
+                return found
+
+            return await asyncio.to_thread(count)
+
+    def add(self, user_id: int):
+        # One out-of-range ID would make every later merge fail, so refuse it up front.
+        if not is_valid_id(user_id):
+            raise ValueError(f"user ID {user_id} does not fit in an int64")
+        if self._merge_ops is not None:
+            self._merge_ops.append((True, user_id))
+        if user_id in self._removed:
+            self._removed.discard(user_id)
+        elif not self._in_base(user_id):
+            self._added.add(user_id)
+
+    def discard(self, user_id: int):
+        if self._merge_ops is not None:
+            self._merge_ops.append((False, user_id))
+        if user_id in self._added:
+            self._added.discard(user_id)
+        elif self._in_base(user_id):
+            self._removed.add(user_id)
+
+    @property
+    def pending(self) -> int:
+        """Number of changes not yet merged into the array file."""
+        return len(self._added) + len(self._removed)
+
+    def _build_sync(self, added: set, removed: set):
+        # Reads the current mapping from a worker thread; the mapping is only swapped
+        # on the event loop after this returns, so it stays valid for the whole build.
+        merged = heapq.merge((i for i in self._base if i not in removed), sorted(added))
+        packed = array("q", merged)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            packed.tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        return tmp_path
+
+    async def merge(self):
+        """Fold the in-memory deltas into a fresh array file off the event loop."""
+        async with self._merge_lock:
+            if not self.pending:
+                return
+            added, removed = set(self._added), set(self._removed)
+            self._merge_ops = []
+            try:
+                tmp_path = await asyncio.to_thread(self._build_sync, added, removed)
+            except BaseException:
+                self._merge_ops = None
+                raise
+            ops, self._merge_ops = self._merge_ops, None
+            # Swap in the new array and replay whatever changed while it was built.
+            self._close_mapping()
+            os.replace(tmp_path, self.path)
+            self._added.clear()
+            self._removed.clear()
+            self.open()
+            for is_add, user_id in ops:
+                if is_add:
+                    self.add(user_id)
+                else:
+                    self.discard(user_id)
@@ -0,0 +1,119 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional
+
+import discord
+
+# discord.py buckets ban/unban routes per guild (guild_id is the major parameter), so
+# running one request per guild at a time and bounding how many guilds are in flight
+# keeps every route bucket at a single caller while staying under the global limit.
+DEFAULT_CONCURRENCY = 8
+MAX_RETRIES = 3
+
+
+class FanOut:
+    """Runs one action per guild in parallel with bounded concurrency."""
+
+    def __init__(self, concurrency: int = DEFAULT_CONCURRENCY, max_retries: int = MAX_RETRIES):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self._guild_locks = {}
+
+    def _guild_lock(self, guild_id: int) -> asyncio.Lock:
+        lock = self._guild_locks.get(guild_id)
+        if lock is None:
+            lock = self._guild_locks[guild_id] = asyncio.Lock()
+        return lock
+
+    async def _call(self, guild: discord.Guild, action: Callable[[discord.Guild], Awaitable[str]]) -> str:
+        attempt = 0
+        while True:
+            try:
+                async with self._guild_lock(guild.id):
+                    return await action(guild)
+            except discord.HTTPException as e:
+                # discord.py already waits out 429s on its own; this only catches the
+                # ones it gives up on, and backs off before trying that guild again.
+                if e.status != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+                await asyncio.sleep(retry_after)
+
+    async def run(
+        self,
+        guilds: Iterable[discord.Guild],
+        action: Callable[[discord.Guild], Awaitable[str]],
+        on_progress: Optional[Callable[[List[str], int, int], Awaitable[None]]] = None,
+        on_result: Optional[Callable[[discord.Guild, str], Awaitable[None]]] = None,
+    ) -> List[str]:
+        """Run ``action`` for every guild and return one result line per guild.
+
+        ``action`` returns the line for a guild; exceptions become a ``❌`` line.
+        ``on_result`` is awaited with each guild and its line as soon as it finishes,
+        then ``on_progress`` with all lines so far.
+        """
+        guilds = list(guilds)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = []
+
+        async def worker(guild):
+            async with semaphore:
+                try:
+                    return guild, await self._call(guild, action)
+                except Exception as e:
+                    return guild, f"❌ {guild.name}: {e}"
+
+        for future in asyncio.as_completed([worker(guild) for guild in guilds]):
+            guild, line = await future
+            results.append(line)
+            if on_result is not None:
+                await on_result(guild, line)
+            if on_progress is not None:
+                await on_progress(results, len(results), len(guilds))
+        return results
+
+
+class ProgressMessage:
+    """Streams fan-out results into an interaction followup, editing it as guilds finish."""
+
+    def __init__(self, interaction: discord.Interaction, title: str, min_interval: float = 1.5):
+        self.interaction = interaction
+        self.title = title
+        self.min_interval = min_interval
+        self.message = None
+        self._last_edit = 0.0
+
+    def _embed(self, lines: List[str], done: int, total: int) -> discord.Embed:
+        description = "\n".join(lines) or "Working..."
+        if len(description) > 4000:
+            description = description[:3990] + "\n…"
+        embed = discord.Embed(title=self.title, description=description, color=discord.Color.orange())
+        if done < total:
+            embed.set_footer(text=f"{done}/{total} done")
+        return embed
+
+    async def start(self, total: int):
+        self.message = await self.interaction.followup.send(embed=self._embed([], 0, total), wait=True)
+        self._last_edit = time.monotonic()
+
+    async def update(self, lines: List[str], done: int, total: int):
+        now = time.monotonic()
+        # The final state is written by finish(), so only intermediate states go here.
+        if self.message is None or done >= total or now - self._last_edit < self.min_interval:
+            return
+        self._last_edit = now
+        try:
+            await self.message.edit(embed=self._embed(lines, done, total))
+        except discord.HTTPException:
+            pass
+
+    async def finish(self, lines: List[str]):
+        embed = self._embed(lines or ["Nothing to do."], len(lines), len(lines))
+        if self.message is None:
+            await self.interaction.followup.send(embed=embed)
+            return
+        try:
+            await self.message.edit(embed=embed)
+        except discord.HTTPException:
+            await self.interaction.followup.send(embed=embed)
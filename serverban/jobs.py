@@ -0,0 +1,255 @@
+import asyncio
+import json
+import os
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import discord
+
+from .fanout import FanOut
+
+KEEP_FINISHED = 20  # finished jobs kept around for /jobs
+CHECKPOINT_INTERVAL = 2.0  # seconds between checkpoints while a job is running
+
+JobHandler = Callable[["Job", discord.Guild], Awaitable[str]]
+JobCallback = Callable[["Job"], Awaitable[None]]
+
+
+class Job:
+    """A global moderation operation that runs once per guild and survives restarts.
+
+    ``completed`` is the checkpoint: guild IDs that have already been processed are
+    skipped on resume. Per-guild work is idempotent (the ban index skips IDs that are
+    already banned), so a guild that was interrupted halfway is simply redone.
+    """
+
+    def __init__(
+        self,
+        job_id: int,
+        kind: str,
+        params: dict,
+        guild_ids: List[int],
+        requested_by: int,
+        channel_id: Optional[int] = None,
+        status: str = "queued",
+        completed: Optional[List[int]] = None,
+        results: Optional[List[str]] = None,
+        state: Optional[dict] = None,
+        created_at: Optional[float] = None,
+        finished_at: Optional[float] = None,
+        error: Optional[str] = None,
+    ):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.guild_ids = guild_ids
+        self.requested_by = requested_by
+        self.channel_id = channel_id
+        self.status = status
+        self.completed = completed or []
+        self.results = results or []
+        self.state = state or {}
+        self.created_at = created_at or time.time()
+        self.finished_at = finished_at
+        self.error = error
+
+        # Runtime only: who is watching, and the rate since this process picked it up.
+        self.watched = False
+        self.on_progress = None
+        self.finished = asyncio.Event()
+        self._run_started = None
+        self._run_start_done = 0
+
+    @property
+    def done(self) -> int:
+        return len(self.completed)
+
+    @property
+    def total(self) -> int:
+        return len(self.guild_ids)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def eta(self) -> Optional[float]:
+        """Seconds until the job finishes, extrapolated from this run's rate."""
+        if self._run_started is None:
+            return None
+        processed = self.done - self._run_start_done
+        if processed <= 0:
+            return None
+        elapsed = time.monotonic() - self._run_started
+        return elapsed / processed * (self.total - self.done)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "guild_ids": self.guild_ids,
+            "requested_by": self.requested_by,
+            "channel_id": self.channel_id,
+            "status": self.status,
+            "completed": self.completed,
+            "results": self.results,
+            "state": self.state,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Job":
+        return cls(
+            job_id=data["id"],
+            kind=data["kind"],
+            params=data["params"],
+            guild_ids=data["guild_ids"],
+            requested_by=data["requested_by"],
+            channel_id=data.get("channel_id"),
+            status=data.get("status", "queued"),
+            completed=data.get("completed"),
+            results=data.get("results"),
+            state=data.get("state"),
+            created_at=data.get("created_at"),
+            finished_at=data.get("finished_at"),
+            error=data.get("error"),
+        )
+
+
+class JobManager:
+    """Persistent queue of :class:`Job`s, checkpointed to a JSON file."""
+
+    def __init__(self, bot, path: str, fanout: FanOut):
+        self.bot = bot
+        self.path = path
+        self.fanout = fanout
+        self.jobs: Dict[int, Job] = {}
+        self.handlers: Dict[str, JobHandler] = {}
+        self.on_complete: Dict[str, JobCallback] = {}
+        self.on_unwatched_finish: Optional[JobCallback] = None
+        self._next_id = 1
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._save_lock = asyncio.Lock()
+        self._last_save = 0.0
+
+    def register(self, kind: str, handler: JobHandler, on_complete: Optional[JobCallback] = None):
+        self.handlers[kind] = handler
+        if on_complete is not None:
+            self.on_complete[kind] = on_complete
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            data = json.load(f)
+        for entry in data.get("jobs", []):
+            job = Job.from_dict(entry)
+            self.jobs[job.id] = job
+        self._next_id = max(data.get("next_id", 1), max(self.jobs, default=0) + 1)
+
+    def _write_sync(self, data: bytes):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    async def save(self, force: bool = True):
+        if not force and time.monotonic() - self._last_save < CHECKPOINT_INTERVAL:
+            return
+        self._last_save = time.monotonic()
+        finished = sorted((j for j in self.jobs.values() if j.is_finished), key=lambda j: j.finished_at or 0)
+        for job in finished[:-KEEP_FINISHED]:
+            del self.jobs[job.id]
+        # Serialise on the loop: the job dicts share lists and dicts that handlers keep
+        # mutating, so only the finished bytes may cross into the worker thread.
+        payload = {"next_id": self._next_id, "jobs": [job.to_dict() for job in self.jobs.values()]}
+        data = json.dumps(payload).encode()
+        async with self._save_lock:
+            await asyncio.to_thread(self._write_sync, data)
+
+    async def submit(
+        self,
+        kind: str,
+        params: dict,
+        guild_ids: List[int],
+        requested_by: int,
+        channel_id: Optional[int] = None,
+        watched: bool = False,
+    ) -> Job:
+        """Queue and start a job.
+
+        Pass ``watched=True`` when the caller will follow it interactively; it has to
+        be set before the job starts, since a job with nothing to do can finish before
+        the caller's next await returns.
+        """
+        job = Job(self._next_id, kind, params, guild_ids, requested_by, channel_id)
+        job.watched = watched
+        self._next_id += 1
+        self.jobs[job.id] = job
+        await self.save()
+        self._start(job)
+        return job
+
+    def resume(self):
+        """Restart every job that hadn't finished when the bot last stopped."""
+        for job in self.jobs.values():
+            if not job.is_finished:
+                self._start(job)
+
+    def _start(self, job: Job):
+        task = self._tasks.get(job.id)
+        if task is None or task.done():
+            self._tasks[job.id] = asyncio.create_task(self._run(job))
+
+    async def _run(self, job: Job):
+        await self.bot.wait_until_ready()
+        job.status = "running"
+        job._run_started = time.monotonic()
+        job._run_start_done = job.done
+        completed = set(job.completed)
+        guilds = []
+        for guild_id in job.guild_ids:
+            if guild_id in completed:
+                continue
+            guild = self.bot.get_guild(guild_id)
+            if guild is None:
+                job.completed.append(guild_id)
+                job.results.append(f"❌ `{guild_id}`: no longer in this server")
+            else:
+                guilds.append(guild)
+
+        async def on_result(guild, line):
+            job.completed.append(guild.id)
+            job.results.append(line)
+            await self.save(force=False)
+            if job.on_progress is not None:
+                await job.on_progress(job.results, job.done, job.total)
+
+        try:
+            await self.fanout.run(guilds, lambda g: self.handlers[job.kind](job, g), on_result=on_result)
+            callback = self.on_complete.get(job.kind)
+            if callback is not None:
+                await callback(job)
+            job.status = "done"
+        except asyncio.CancelledError:
+            # Unloading: leave the job as it was so the next load resumes it.
+            await self.save()
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = time.time()
+        await self.save()
+        job.finished.set()
+        if not job.watched and self.on_unwatched_finish is not None:
+            try:
+                await self.on_unwatched_finish(job)
+            except Exception:
+                pass
+
+    async def close(self):
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+from typing import Optional
+
+from .banstore import BanStore, is_valid_id, write_sorted_ids
+
+COMPACT_EVERY = 1000  # journal entries before the array file is rewritten
+
+
+class BanJournal:
+    """Append-only add/remove log on top of the global ban list's array file.
+
+    Every change is one ``+<id>`` or ``-<id>`` line appended and fsync'd from a worker
+    thread, so the event loop never blocks on disk and a crash can at worst lose the
+    line being written. Once enough lines pile up the store's deltas are merged into a
+    new array file in the background and the journal is truncated.
+    """
+
+    def __init__(
+        self,
+        store: BanStore,
+        journal_path: str,
+        legacy_path: Optional[str] = None,
+        compact_every: int = COMPACT_EVERY,
+    ):
+        self.store = store
+        self.journal_path = journal_path
+        self.legacy_path = legacy_path
+        self.compact_every = compact_every
+        self.entries = 0
+        self._lock = asyncio.Lock()
+        self._compact_task = None
+
+    def _migrate_legacy(self):
+        # Older versions kept the whole list as a JSON array; convert it once.
+        if os.path.exists(self.store.path) or not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        with open(self.legacy_path, "r") as f:
+            write_sorted_ids(self.store.path, (int(i) for i in json.load(f) if is_valid_id(int(i))))
+
+    def load(self) -> BanStore:
+        """Open the array file and replay the journal over it."""
+        self._migrate_legacy()
+        self.store.open()
+
+        self.entries = 0
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, "rb") as f:
+                data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                # A crash mid-append leaves a torn final line; cut it off so the next
+                # append doesn't get glued onto it.
+                with open(self.journal_path, "r+b") as f:
+                    f.truncate(end)
+            for line in data[:end].split(b"\n"):
+                try:
+                    user_id = int(line[1:])
+                except ValueError:
+                    continue
+                if not is_valid_id(user_id):
+                    # Journals written before IDs were range-checked may hold one;
+                    # skipping it lets the next compaction drop the line.
+                    continue
+                if line[:1] == b"+":
+                    self.store.add(user_id)
+                elif line[:1] == b"-":
+                    self.store.discard(user_id)
+                else:
+                    continue
+                self.entries += 1
+        return self.store
+
+    def _append_sync(self, line: bytes):
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def _append(self, op: bytes, user_ids: list):
+        data = b"".join(op + str(user_id).encode() + b"\n" for user_id in user_ids)
+        async with self._lock:
+            await asyncio.to_thread(self._append_sync, data)
+            self.entries += len(user_ids)
+        if self.entries >= self.compact_every:
+            self.schedule_compaction()
+
+    async def add(self, user_id: int):
+        await self._append(b"+", [user_id])
+
+    async def add_many(self, user_ids: list):
+        """Journal several additions with a single write and fsync."""
+        await self._append(b"+", user_ids)
+
+    async def remove(self, user_id: int):
+        await self._append(b"-", [user_id])
+
+    async def remove_many(self, user_ids: list):
+        await self._append(b"-", user_ids)
+
+    def _truncate_sync(self):
+        with open(self.journal_path, "wb") as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    async def compact(self):
+        async with self._lock:
+            # Appends wait on the lock, so the store already holds every journalled
+            # change. Changes made in memory meanwhile are journalled after the
+            # truncate and replay idempotently on top of the merged array.
+            await self.store.merge()
+            await asyncio.to_thread(self._truncate_sync)
+            self.entries = 0
+
+    def schedule_compaction(self):
+        if self._compact_task is None or self._compact_task.done():
+            self._compact_task = asyncio.create_task(self.compact())
+
+    async def close(self):
+        if self._compact_task is not None:
+            await self._compact_task
+        self.store.close()
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    action TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    moderator_id INTEGER,
+    reason TEXT,
+    created_at REAL NOT NULL,
+    origin_guild_id INTEGER,
+    is_global INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS actions_user ON actions (user_id, created_at);
+CREATE INDEX IF NOT EXISTS actions_moderator ON actions (moderator_id, created_at);
+CREATE INDEX IF NOT EXISTS actions_time ON actions (created_at);
+CREATE TABLE IF NOT EXISTS do_not_unban (
+    user_id INTEGER PRIMARY KEY,
+    reason TEXT NOT NULL,
+    added_by TEXT NOT NULL,
+    added_at REAL NOT NULL
+);
+"""
+
+
+class BanMetadataStore:
+    """SQLite record of who banned whom, when, why and where, plus the Do Not Unban list.
+
+    Every query runs in a worker thread on one shared connection, and each lookup
+    (by user, by moderator, by time) is served by its own index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(*args)
+
+    async def _call(self, fn, *args):
+        return await asyncio.to_thread(self._run, fn, *args)
+
+    def _record_sync(self, rows: List[tuple]):
+        self._conn.executemany(
+            "INSERT INTO actions (action, user_id, moderator_id, reason, created_at, origin_guild_id, is_global) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+
+    async def record(
+        self,
+        action: str,
+        user_ids: Iterable[int],
+        moderator_id: Optional[int],
+        reason: Optional[str],
+        origin_guild_id: Optional[int],
+        is_global: bool,
+    ):
+        """Record one ban/unban row per user ID, all in a single transaction."""
+        now = time.time()
+        rows = [(action, user_id, moderator_id, reason, now, origin_guild_id, int(is_global)) for user_id in user_ids]
+        if rows:
+            await self._call(self._record_sync, rows)
+
+    def _search_sync(self, clauses: List[str], params: List, limit: int) -> List[sqlite3.Row]:
+        where = " AND ".join(clauses) or "1"
+        return self._conn.execute(
+            f"SELECT * FROM actions WHERE {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)
+        ).fetchall()
+
+    async def search(
+        self,
+        user_id: Optional[int] = None,
+        moderator_id: Optional[int] = None,
+        since: Optional[float] = None,
+        action: Optional[str] = None,
+        limit: int = 25,
+    ) -> List[sqlite3.Row]:
+        """Most recent actions matching every given filter."""
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if moderator_id is not None:
+            clauses.append("moderator_id = ?")
+            params.append(moderator_id)
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        return await self._call(self._search_sync, clauses, params, limit)
+
+    def load_do_not_unban(self) -> Dict[int, dict]:
+        rows = self._run(lambda: self._conn.execute("SELECT * FROM do_not_unban").fetchall())
+        return {row["user_id"]: {"reason": row["reason"], "added_by": row["added_by"]} for row in rows}
+
+    def _set_dnu_sync(self, user_id: int, reason: str, added_by: str):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO do_not_unban (user_id, reason, added_by, added_at) VALUES (?, ?, ?, ?)",
+            (user_id, reason, added_by, time.time()),
+        )
+        self._conn.commit()
+
+    async def set_do_not_unban(self, user_id: int, reason: str, added_by: str):
+        await self._call(self._set_dnu_sync, user_id, reason, added_by)
+
+    def _remove_dnu_sync(self, user_id: int):
+        self._conn.execute("DELETE FROM do_not_unban WHERE user_id = ?", (user_id,))
+        self._conn.commit()
+
+    async def remove_do_not_unban(self, user_id: int):
+        await self._call(self._remove_dnu_sync, user_id)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
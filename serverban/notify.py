@@ -0,0 +1,86 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+import discord
+
+USER_CACHE_SIZE = 2048
+USER_CACHE_TTL = 600  # seconds a fetched user is reused before asking the API again
+DELIVERY_WORKERS = 2
+
+
+class UserResolver:
+    """Cache-first user lookup: the gateway cache, then an LRU of fetched users, then REST."""
+
+    def __init__(self, bot, maxsize: int = USER_CACHE_SIZE, ttl: float = USER_CACHE_TTL):
+        self.bot = bot
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache = OrderedDict()  # user_id -> (user, expires_at)
+
+    async def resolve(self, user_id: int) -> discord.User:
+        user = self.bot.get_user(user_id)
+        if user is not None:
+            return user
+
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            user, expires_at = cached
+            if expires_at > time.monotonic():
+                self._cache.move_to_end(user_id)
+                return user
+            del self._cache[user_id]
+
+        user = await self.bot.fetch_user(user_id)
+        self._cache[user_id] = (user, time.monotonic() + self.ttl)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return user
+
+
+class DeliveryQueue:
+    """Runs notification coroutines (DMs, log and action embeds) in the background.
+
+    Commands hand their notifications over here and carry on with enforcement, so
+    moderators never wait on Discord round trips that don't change who is banned.
+    """
+
+    def __init__(self, workers: int = DELIVERY_WORKERS):
+        self.workers = workers
+        self._queue = asyncio.Queue()
+        self._tasks = []
+
+    def _ensure_workers(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def submit(self, deliver: Callable[[], Awaitable[None]]) -> asyncio.Future:
+        """Queue ``deliver`` and return a future that resolves once it has run."""
+        self._ensure_workers()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((deliver, future))
+        return future
+
+    async def _worker(self):
+        while True:
+            deliver, future = await self._queue.get()
+            try:
+                await deliver()
+            except Exception as e:
+                print(f"[ServerBan Notify] Delivery failed: {e}")
+            finally:
+                if not future.done():
+                    future.set_result(None)
+                self._queue.task_done()
+
+    async def close(self, timeout: float = 10):
+        """Give queued deliveries a chance to finish, then stop the workers."""
+        if self._tasks:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
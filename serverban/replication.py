@@ -0,0 +1,296 @@
+import asyncio
+import json
+import os
+import secrets
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+
+BACKLOG_SIZE = 10000  # deltas the leader keeps for followers that reconnect
+SNAPSHOT_CHUNK = 10000  # IDs per snapshot line
+MAX_FOLLOWER_BUFFER = 16 * 1024 * 1024  # a follower this far behind is dropped and resynced
+RECONNECT_DELAY = 1
+RECONNECT_MAX_DELAY = 30
+SNAPSHOT_REMOVE_LIMIT = 100  # more IDs than this missing from a snapshot looks like a lost leader store
+
+# apply(op, user_ids, enforce=True) -> IDs that changed; enforce=False only updates the list.
+ApplyCallback = Callable[..., Awaitable[List[int]]]
+
+
+def load_config(path: str) -> Optional[dict]:
+    """Read the replication settings file, or None when replication is off.
+
+    ``{"role": "leader" | "follower", "address": "127.0.0.1:8765" | "unix:/path", "token": "..."}``
+
+    The token is required for TCP addresses, which any local process can connect to.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        config = json.load(f)
+    if config.get("role") not in ("leader", "follower") or not config.get("address"):
+        raise ValueError(f"{path}: role must be leader or follower and address is required")
+    return config
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class Replicator:
+    """Keeps the global ban list identical across bot processes on one machine.
+
+    One process is the leader and the others connect to it as followers over a TCP
+    or Unix socket, one JSON object per line. The leader numbers every add/remove
+    delta and pushes it to all followers as soon as it is applied. Followers send
+    their own changes to the leader, which applies, numbers and pushes them back out
+    like any other. A follower that reconnects replays what it missed from the
+    leader's backlog, or gets a full snapshot when it is too far behind or the
+    leader has restarted (a new ``epoch``).
+
+    A follower keeps each of its own changes in ``_outbox`` until the leader acks it,
+    which happens only after the numbered delta for it has been sent, and resends
+    whatever is still unacked when it reconnects. IDs a snapshot lacks are dropped
+    from the list without being unbanned, and not at all if there are suspiciously
+    many of them.
+    """
+
+    def __init__(self, role: str, address: str, store, apply: ApplyCallback, token: Optional[str] = None):
+        if not token and not address.startswith("unix:"):
+            raise ValueError("a token is required to replicate over TCP")
+        self.role = role
+        self.address = address
+        self.store = store
+        self.apply = apply
+        self.token = token
+        self.epoch = secrets.token_hex(8) if role == "leader" else None
+        self.seq = 0
+        self.backlog = deque(maxlen=BACKLOG_SIZE)  # (seq, encoded delta line)
+        self.followers = set()
+        self._connections = set()  # leader: one task per follower connection
+        self.connected = False
+        self._server = None
+        self._task = None
+        self._writer = None
+        self._outbox = []  # follower: (ref, op, ids) not yet acked by the leader
+        self._next_ref = 0
+        self._sent_ref = 0  # follower: last outbox ref written on the current connection
+
+    @property
+    def is_leader(self) -> bool:
+        return self.role == "leader"
+
+    async def start(self):
+        if self.is_leader:
+            if self.address.startswith("unix:"):
+                path = self.address[len("unix:"):]
+                if os.path.exists(path):
+                    os.remove(path)
+                self._server = await asyncio.start_unix_server(self._serve, path=path)
+            else:
+                host, port = self.address.rsplit(":", 1)
+                self._server = await asyncio.start_server(self._serve, host, int(port))
+        else:
+            self._task = asyncio.create_task(self._follow())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def publish(self, op: str, user_ids: List[int]):
+        """Ship a change made on this node to the rest of the cluster."""
+        if not user_ids:
+            return
+        if self.is_leader:
+            self.seq += 1
+            line = _encode({"type": "delta", "seq": self.seq, "op": op, "ids": list(user_ids)})
+            self.backlog.append((self.seq, line))
+            for writer in list(self.followers):
+                self._send(writer, line)
+        else:
+            self._next_ref += 1
+            self._outbox.append((self._next_ref, op, list(user_ids)))
+            if self._writer is not None and self.connected:
+                self._write_outbox(self._writer)
+
+    def _write_outbox(self, writer: asyncio.StreamWriter):
+        for ref, op, user_ids in self._outbox:
+            if ref > self._sent_ref:
+                writer.write(_encode({"type": op, "ids": user_ids, "ref": ref}))
+                self._sent_ref = ref
+
+    def _send(self, writer: asyncio.StreamWriter, line: bytes):
+        writer.write(line)
+        if writer.transport.get_write_buffer_size() > MAX_FOLLOWER_BUFFER:
+            # Stop buffering for a follower that isn't reading; it resyncs on reconnect.
+            self.followers.discard(writer)
+            writer.close()
+
+    # Leader side
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        authed = False
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                kind = message["type"]
+                if kind == "hello":
+                    authed = not self.token or message.get("token") == self.token
+                    if not authed:
+                        break
+                elif not authed:
+                    break
+                elif kind in ("add", "remove"):
+                    changed = await self.apply(kind, [int(user_id) for user_id in message["ids"]])
+                    self.publish(kind, changed)
+                    # The delta (if any) is already queued to this follower, so the
+                    # ack can never overtake it.
+                    writer.write(_encode({"type": "ack", "ref": message.get("ref"), "seq": self.seq}))
+                elif kind == "sync":
+                    if not await self._catch_up(writer, message.get("epoch"), int(message.get("seq", 0))):
+                        break
+        except (ConnectionError, ValueError, KeyError) as e:
+            print(f"[ServerBan Replication] Follower connection dropped: {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._connections.discard(task)
+            self.followers.discard(writer)
+            writer.close()
+
+    def _backlog_since(self, seq: int) -> Optional[List[bytes]]:
+        """Delta lines after ``seq``, or None if some of them already left the backlog."""
+        if seq == self.seq:
+            return []
+        if not self.backlog or self.backlog[0][0] > seq + 1:
+            return None
+        return [line for line_seq, line in self.backlog if line_seq > seq]
+
+    def _snapshot_lines(self, ids, seq: int) -> List[bytes]:
+        lines = []
+        chunk = []
+        for user_id in ids:
+            chunk.append(user_id)
+            if len(chunk) >= SNAPSHOT_CHUNK:
+                lines.append(_encode({"type": "snapshot", "epoch": self.epoch, "seq": seq, "ids": chunk, "last": False}))
+                chunk = []
+        lines.append(_encode({"type": "snapshot", "epoch": self.epoch, "seq": seq, "ids": chunk, "last": True}))
+        return lines
+
+    async def _catch_up(self, writer: asyncio.StreamWriter, epoch: Optional[str], seq: int) -> bool:
+        lines = []
+        missed = self._backlog_since(seq) if epoch == self.epoch and seq <= self.seq else None
+        if missed is None:
+            seq = self.seq
+            lines = await self.store.stream(lambda ids: self._snapshot_lines(ids, seq))
+            # Deltas applied while the snapshot was built are resent on top of it;
+            # applying them twice is harmless.
+            missed = self._backlog_since(seq)
+            if missed is None:
+                return False
+        # Nothing awaits between queueing the catch-up and registering the follower,
+        # so no delta can slip in between or arrive ahead of the snapshot.
+        for line in lines + missed:
+            writer.write(line)
+        writer.write(_encode({"type": "synced", "seq": self.seq}))
+        self.followers.add(writer)
+        await writer.drain()
+        return True
+
+    # Follower side
+
+    async def _connect(self):
+        if self.address.startswith("unix:"):
+            return await asyncio.open_unix_connection(self.address[len("unix:"):])
+        host, port = self.address.rsplit(":", 1)
+        return await asyncio.open_connection(host, int(port))
+
+    async def _follow(self):
+        delay = RECONNECT_DELAY
+        while True:
+            try:
+                reader, writer = await self._connect()
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            delay = RECONNECT_DELAY
+            self._writer = writer
+            try:
+                await self._session(reader, writer)
+            except (ConnectionError, ValueError, KeyError) as e:
+                print(f"[ServerBan Replication] Lost the leader: {e}")
+            finally:
+                self.connected = False
+                self._writer = None
+                writer.close()
+            await asyncio.sleep(delay)
+
+    async def _session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # Unacked changes go first so the catch-up that follows already includes them.
+        writer.write(_encode({"type": "hello", "token": self.token}))
+        self._sent_ref = 0
+        self._write_outbox(writer)
+        writer.write(_encode({"type": "sync", "epoch": self.epoch, "seq": self.seq}))
+        await writer.drain()
+
+        snapshot = None
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise ConnectionError("leader closed the connection")
+            message = json.loads(line)
+            kind = message["type"]
+            if kind == "snapshot":
+                if snapshot is None:
+                    snapshot = set()
+                snapshot.update(message["ids"])
+                if message["last"]:
+                    await self._apply_snapshot(snapshot)
+                    self.epoch = message["epoch"]
+                    self.seq = message["seq"]
+                    snapshot = None
+            elif kind == "delta":
+                if message["seq"] <= self.seq:
+                    continue
+                if message["seq"] != self.seq + 1:
+                    raise ValueError(f"expected delta {self.seq + 1}, got {message['seq']}")
+                await self.apply(message["op"], message["ids"])
+                self.seq = message["seq"]
+            elif kind == "ack":
+                ref = message["ref"]
+                self._outbox = [entry for entry in self._outbox if entry[0] > ref]
+            elif kind == "synced":
+                self._write_outbox(writer)
+                self.connected = True
+
+    async def _apply_snapshot(self, snapshot: set):
+        # Changes still waiting in the outbox are newer than the snapshot; keep them.
+        pending = {user_id for _, _, user_ids in self._outbox for user_id in user_ids}
+        stale = await self.store.stream(
+            lambda ids: [user_id for user_id in ids if user_id not in snapshot and user_id not in pending]
+        )
+        missing = [user_id for user_id in snapshot if user_id not in self.store and user_id not in pending]
+        await self.apply("add", sorted(missing))
+        if not stale:
+            return
+        # A snapshot says nothing about why an ID is absent; a leader that lost its
+        # store would otherwise unban everyone. Never enforce these, and keep them
+        # outright when there are too many to be a few missed unbans.
+        if len(stale) > SNAPSHOT_REMOVE_LIMIT:
+            print(f"[ServerBan Replication] Leader snapshot lacks {len(stale)} IDs this node has; keeping them.")
+            return
+        print(f"[ServerBan Replication] Dropping {len(stale)} IDs the leader no longer lists (not unbanning).")
+        await self.apply("remove", stale, enforce=False)
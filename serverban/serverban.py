@@ -5,9 +5,21 @@ from redbot.core import commands as red_commands
 from redbot.core.bot import Red
 from typing import Optional
 import asyncio
+import aiohttp
+import csv
+import gzip
+import io
+import re
+import time
 from datetime import datetime
-import json
-import os
+
+from .fanout import FanOut, ProgressMessage
+from .banstore import BanStore, is_valid_id
+from .jobs import JobManager
+from .journal import BanJournal
+from .metadata import BanMetadataStore
+from .notify import DeliveryQueue, UserResolver
+from .replication import Replicator, load_config
 
 LOG_CHANNEL_ID = 1399770568114573395
 ESCALATE_ROLE_ID = 1355526020827971705
@@ -16,29 +28,401 @@ ALLOWED_GLOBAL_IDS = {1174820638997872721, 1274438209715044415, 6902390971507671
 APPEAL_LINK = "https://forms.gle/gR6f9iaaprASRgyP9"
 BAN_GIF = "https://media.discordapp.net/attachments/1387199076675747874/1399823656997228574/c00kie-get-banned.gif"
 UNBAN_GIF = "https://media.discordapp.net/attachments/1387199076675747874/1399823787167449088/unban-fivem.gif"
-BANLIST_FILE = "global_ban_list.json"
+BANLIST_FILE = "global_ban_list.json"  # legacy JSON list, migrated into BANSTORE_FILE on load
+BANSTORE_FILE = "global_ban_list.bin"
+BANJOURNAL_FILE = "global_ban_list.journal"
+DM_GRACE_PERIOD = 2  # seconds enforcement waits for the ban DM; DMs fail once no server is shared
+JOBS_FILE = "serverban_jobs.json"
+METADATA_FILE = "serverban_metadata.db"
+REPLICATION_FILE = "serverban_replication.json"  # present only on nodes that replicate the list
+JOB_WATCH_TIMEOUT = 14 * 60  # interaction tokens die at 15 minutes; hand off to /jobs before that
+BULK_BAN_CHUNK = 200  # Discord's bulk-ban endpoint limit
+MAX_ID_FILE_SIZE = 2 * 1024 * 1024
+MASS_NOTIFY_LIMIT = 5  # above this, massglobalban posts one summary instead of per-user DMs/logs
+JOB_LABELS = {"ban": "Global ban", "bulkban": "Mass global ban", "sync": "Global ban sync"}
+ID_PATTERN = re.compile(rb"\d{15,20}")
+INDEX_REFRESH_INTERVAL = 60 * 60  # seconds before a guild's bans are walked again to catch missed events
 
 class ServerBan(red_commands.Cog):
     def __init__(self, bot: Red):
         self.bot = bot
         self.tree = bot.tree
-        self.blacklisted_users = {}
+        self.metadata = BanMetadataStore(METADATA_FILE)
+        self.blacklisted_users = self.metadata.load_do_not_unban()
         self.server_blacklist = {1368969894242291742, 1298444715804327967}
         self._load_global_bans()
+        self.replication = self._load_replication()
+        self._replicated_sync_task = None
         self.active_messages = {}
         self._sync_task = None
         self.last_ban_sync = None  # Track last sync time
+        self.guild_ban_index = {}  # guild_id -> set of banned user IDs
+        self._index_tasks = {}  # guild_id -> task currently walking that guild's bans
+        self._index_pending = {}  # guild_id -> {user_id: banned?} seen during that walk
+        self._index_warm_task = None
+        self._index_walked_at = {}  # guild_id -> monotonic time its bans were last walked
+        self.fanout = FanOut()
+        self.resolver = UserResolver(bot)
+        self.delivery = DeliveryQueue()
+        self.ban_generation = 0  # bumped whenever an ID is added to the global ban list
+        self._reconciled_generation = {}  # guild_id -> ban_generation it was last fully synced at
+        self.guild_global_coverage = {}  # guild_id -> how many global-list IDs are banned there
+        self._coverage_changes = {}  # guild_id -> global-list changes made while its coverage is being counted
+        self.jobs = JobManager(bot, JOBS_FILE, self.fanout)
+        self.jobs.register("ban", self._job_ban)
+        self.jobs.register("bulkban", self._job_bulk_ban, on_complete=self._job_bulk_ban_done)
+        self.jobs.register("sync", self._job_sync, on_complete=self._job_sync_done)
+        self.jobs.on_unwatched_finish = self._announce_job
+        self.jobs.load()
 
     def _load_global_bans(self):
-        if os.path.exists(BANLIST_FILE):
-            with open(BANLIST_FILE, "r") as f:
-                self.global_ban_list = set(json.load(f))
+        self.journal = BanJournal(BanStore(BANSTORE_FILE), BANJOURNAL_FILE, legacy_path=BANLIST_FILE)
+        self.global_ban_list = self.journal.load()
+
+    def _load_replication(self):
+        config = load_config(REPLICATION_FILE)
+        if config is None:
+            return None
+        return Replicator(
+            config["role"], config["address"], self.global_ban_list, self._apply_replicated, token=config.get("token")
+        )
+
+    async def _add_global_ban(self, user_id: int):
+        await self._add_global_bans([user_id])
+
+    async def _add_global_bans(self, user_ids: list, replicate: bool = True) -> list:
+        new_ids = [user_id for user_id in user_ids if user_id not in self.global_ban_list]
+        if not new_ids:
+            return []
+        for user_id in new_ids:
+            self.global_ban_list.add(user_id)
+            self._adjust_coverage(user_id, 1)
+        self.ban_generation += 1
+        await self.journal.add_many(new_ids)
+        if replicate and self.replication is not None:
+            self.replication.publish("add", new_ids)
+        return new_ids
+
+    async def _remove_global_ban(self, user_id: int):
+        await self._remove_global_bans([user_id])
+
+    async def _remove_global_bans(self, user_ids: list, replicate: bool = True) -> list:
+        # Removing an ID can't put a guild out of sync, so the generation stays put.
+        removed = [user_id for user_id in user_ids if user_id in self.global_ban_list]
+        if not removed:
+            return []
+        for user_id in removed:
+            self.global_ban_list.discard(user_id)
+            self._adjust_coverage(user_id, -1)
+        await self.journal.remove_many(removed)
+        if replicate and self.replication is not None:
+            self.replication.publish("remove", removed)
+        return removed
+
+    async def _apply_replicated(self, op: str, user_ids: list, enforce: bool = True) -> list:
+        """Apply a change that came from another node and, if ``enforce``, carry it out in this node's servers."""
+        if op == "add":
+            changed = await self._add_global_bans([user_id for user_id in user_ids if is_valid_id(user_id)], replicate=False)
+            if changed and enforce and (self._replicated_sync_task is None or self._replicated_sync_task.done()):
+                # The generation bump marks every guild stale; the pass bans only what each is missing.
+                self._replicated_sync_task = asyncio.create_task(self.sync_pass())
+            return changed
+
+        # The Do Not Unban list is per node and isn't replicated; a node that has the
+        # user on it keeps them on the list and banned. Since the leader only
+        # re-publishes what it actually changed, this also stops it spreading the remove.
+        kept = [user_id for user_id in user_ids if user_id in self.blacklisted_users]
+        if kept:
+            print(f"[ServerBan Replication] Ignoring replicated unban of Do Not Unban users: {', '.join(map(str, kept))}")
+        changed = await self._remove_global_bans(
+            [user_id for user_id in user_ids if user_id not in self.blacklisted_users], replicate=False
+        )
+        if not enforce:
+            return changed
+        for user_id in changed:
+            guilds = [
+                g for g in self.bot.guilds
+                if g.id not in self.server_blacklist and user_id in self.guild_ban_index.get(g.id, ())
+            ]
+            if guilds:
+                asyncio.create_task(self.fanout.run(
+                    guilds, lambda g, user_id=user_id: self._unban_in_guild(g, user_id, "Global unban (replicated)")
+                ))
+        return changed
+
+    def _adjust_coverage(self, user_id: int, delta: int):
+        for changes in self._coverage_changes.values():
+            changes.append((user_id, delta))
+        for guild_id, banned in self.guild_ban_index.items():
+            if user_id in banned:
+                self.guild_global_coverage[guild_id] = self.guild_global_coverage.get(guild_id, 0) + delta
+
+    async def _count_coverage(self, guild_id: int, banned: set) -> int:
+        """How many global-list IDs are in ``banned``, counted off the event loop.
+
+        This is the only place that walks a guild's whole ban set; afterwards the
+        count is kept current one event at a time. List changes made during the
+        count are recorded by _adjust_coverage and applied on top.
+        """
+        changes = []
+        try:
+            covered = await self.global_ban_list.count_members(
+                banned, on_snapshot=lambda: self._coverage_changes.__setitem__(guild_id, changes)
+            )
+        finally:
+            self._coverage_changes.pop(guild_id, None)
+        return covered + sum(delta for user_id, delta in changes if user_id in banned)
+
+    async def _missing_global_bans(self, guild_id: int, banned: set) -> list:
+        """Global-list IDs not in a guild's ban index, in ascending order."""
+        if self.guild_global_coverage.get(guild_id) == len(self.global_ban_list):
+            return []
+        # Walking the whole list is far too slow for the event loop at a million IDs.
+        return await self.global_ban_list.stream(lambda ids: [user_id for user_id in ids if user_id not in banned])
+
+    def _drop_guild_index(self, guild_id: int):
+        self.guild_ban_index.pop(guild_id, None)
+        self._index_walked_at.pop(guild_id, None)
+        self.guild_global_coverage.pop(guild_id, None)
+
+    async def _fetch_guild_bans(self, guild: discord.Guild) -> set:
+        # Ban/unban events that arrive while the listing is being paginated are
+        # recorded here and replayed on top of it, so the index never misses them.
+        pending = self._index_pending[guild.id] = {}
+        try:
+            banned = set()
+            async for entry in guild.bans(limit=None):
+                banned.add(entry.user.id)
+            covered = await self._count_coverage(guild.id, banned)
+            for user_id, is_banned in pending.items():
+                if is_banned == (user_id in banned):
+                    continue
+                if is_banned:
+                    banned.add(user_id)
+                else:
+                    banned.discard(user_id)
+                if user_id in self.global_ban_list:
+                    covered += 1 if is_banned else -1
+        finally:
+            self._index_pending.pop(guild.id, None)
+        self.guild_ban_index[guild.id] = banned
+        self.guild_global_coverage[guild.id] = covered
+        self._index_walked_at[guild.id] = time.monotonic()
+        # The walk may have turned up bans lifted while events were being missed.
+        self._reconciled_generation.pop(guild.id, None)
+        return banned
+
+    def _index_is_stale(self, guild_id: int) -> bool:
+        walked_at = self._index_walked_at.get(guild_id)
+        return walked_at is not None and time.monotonic() - walked_at > INDEX_REFRESH_INTERVAL
+
+    async def _ensure_ban_index(self, guild: discord.Guild, refresh: bool = False) -> set:
+        """Return the indexed ban set for a guild, walking its bans if it has none yet.
+
+        With ``refresh`` the bans are walked again even if indexed; the old index keeps
+        serving lookups until the new walk replaces it.
+        """
+        task = self._index_tasks.get(guild.id)
+        if task is None:
+            banned = self.guild_ban_index.get(guild.id)
+            if banned is not None and not refresh:
+                return banned
+            task = asyncio.create_task(self._fetch_guild_bans(guild))
+            self._index_tasks[guild.id] = task
+            task.add_done_callback(lambda _: self._index_tasks.pop(guild.id, None))
+        return await asyncio.shield(task)
+
+    async def _is_banned(self, guild: discord.Guild, user_id: int) -> bool:
+        return user_id in await self._ensure_ban_index(guild)
+
+    def _record_ban_event(self, guild_id: int, user_id: int, is_banned: bool):
+        pending = self._index_pending.get(guild_id)
+        if pending is not None:
+            pending[user_id] = is_banned
+        banned = self.guild_ban_index.get(guild_id)
+        if banned is None or (user_id in banned) == is_banned:
+            return
+        if is_banned:
+            banned.add(user_id)
+        else:
+            banned.discard(user_id)
+        if user_id in self.global_ban_list:
+            self.guild_global_coverage[guild_id] += 1 if is_banned else -1
+
+    async def _ban_and_index(self, guild: discord.Guild, user_id: int, reason: str):
+        await guild.ban(discord.Object(id=user_id), reason=reason)
+        self._record_ban_event(guild.id, user_id, True)
+
+    def _target_guilds(self, interaction: discord.Interaction, is_global: bool) -> list:
+        if not is_global:
+            return [interaction.guild]
+        return [g for g in self.bot.guilds if g.id not in self.server_blacklist]
+
+    async def _ban_in_guild(self, guild: discord.Guild, user_id: int, reason: str) -> str:
+        if await self._is_banned(guild, user_id):
+            return f"⚠️ {guild.name}: Already banned"
+        await self._ban_and_index(guild, user_id, reason)
+        return f"✅ {guild.name}"
+
+    async def _unban_in_guild(self, guild: discord.Guild, user_id: int, reason: str) -> str:
+        await guild.unban(discord.Object(id=user_id), reason=reason)
+        self._record_ban_event(guild.id, user_id, False)
+        return f"✅ {guild.name}"
+
+    async def _watch_job(self, interaction: discord.Interaction, job, title: str, header: list = None) -> bool:
+        """Stream a job's progress into the followup; return False if it outlived the interaction.
+
+        The job must have been submitted with ``watched=True``.
+        """
+        header = header or []
+        progress = ProgressMessage(interaction, title)
+        await progress.start(job.total)
+
+        async def report(lines, done, total):
+            await progress.update(header + lines, done, total)
+
+        job.watched = True
+        job.on_progress = report
+        try:
+            await asyncio.wait_for(asyncio.shield(job.finished.wait()), timeout=JOB_WATCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            job.watched = False
+            job.on_progress = None
+            await interaction.followup.send(embed=self._success_embed(
+                f"Still running in the background as job #{job.id} ({job.done}/{job.total} servers). "
+                "Use /jobs to follow it; the results will be posted in this channel."
+            ))
+            return False
+        job.on_progress = None
+        if job.status == "failed":
+            await progress.finish(header + job.results + [f"❌ Job failed: {job.error}"])
+        else:
+            await progress.finish(header + job.results)
+        return True
+
+    async def _announce_job(self, job):
+        channel = self.bot.get_channel(job.channel_id) if job.channel_id else None
+        if channel is None:
+            return
+        description = "\n".join(job.results) or "Nothing to do."
+        if len(description) > 4000:
+            description = description[:3990] + "\n…"
+        embed = discord.Embed(
+            title=f"Job #{job.id} ({JOB_LABELS.get(job.kind, job.kind)}) {job.status}",
+            description=description,
+            color=discord.Color.orange()
+        )
+        await channel.send(content=f"<@{job.requested_by}>", embed=embed)
+
+    async def _job_ban(self, job, guild: discord.Guild) -> str:
+        return await self._ban_in_guild(guild, job.params["user_id"], job.params["reason"])
+
+    async def _job_bulk_ban(self, job, guild: discord.Guild) -> str:
+        enforced = set()
+        try:
+            return await self._bulk_ban_in_guild(guild, job.params["user_ids"], job.params["reason"], enforced)
+        finally:
+            job.state["enforced"] = sorted(enforced.union(job.state.get("enforced", [])))
+
+    async def _job_bulk_ban_done(self, job):
+        # Runs however the job finishes (watched, handed off to /jobs, or resumed on
+        # load), so the list, the metadata store and the log channel always agree.
+        enforced = set(job.state.get("enforced", []))
+        added = [user_id for user_id in job.params["user_ids"] if user_id in enforced]
+        await self._add_global_bans(added)
+        if not added:
+            return
+        reason = job.params["reason"]
+        await self.metadata.record("ban", added, job.requested_by, reason, job.params.get("guild_id"), True)
+
+        try:
+            moderator = await self.resolver.resolve(job.requested_by)
+        except discord.HTTPException as e:
+            print(f"[GlobalBan] Could not resolve moderator {job.requested_by} for job #{job.id} logs: {e}")
+            return
+        if len(job.params["user_ids"]) <= MASS_NOTIFY_LIMIT:
+            channel = self.bot.get_channel(job.channel_id) if job.channel_id else None
+            for user_id in added:
+                self._queue_notices(
+                    user_id, lambda user: self.log_global_ban(user, moderator, reason), channel,
+                    lambda user: self._action_embed(user, "ban", reason, moderator, is_global=True)
+                )
         else:
-            self.global_ban_list = set()
+            self.delivery.submit(lambda: self.log_mass_global_ban(added, moderator, reason))
+
+    async def _job_sync(self, job, guild: discord.Guild) -> str:
+        issued, already, failed = await self.reconcile_guild(guild, "Global ban sync", force=True)
+        return f"**{guild.name}** ({guild.id}): ✅ {issued} banned, ⚠️ {already} already banned, ❌ {failed} failed"
+
+    async def _job_sync_done(self, job):
+        self.last_ban_sync = datetime.utcnow()
+
+    async def _warm_ban_index(self):
+        await self.bot.wait_until_ready()
+        # Ban listings are rate limited per guild, so several guilds can page at once.
+        semaphore = asyncio.Semaphore(self.fanout.concurrency)
 
-    def _save_global_bans(self):
-        with open(BANLIST_FILE, "w") as f:
-            json.dump(list(self.global_ban_list), f)
+        async def warm(guild):
+            async with semaphore:
+                try:
+                    await self._ensure_ban_index(guild)
+                except discord.Forbidden:
+                    print(f"[GlobalBan Index] Missing permissions in {guild.name} ({guild.id})")
+                except Exception as e:
+                    print(f"[GlobalBan Index] Error in {guild.name}: {e}")
+
+        await asyncio.gather(*(warm(g) for g in self.bot.guilds if g.id not in self.server_blacklist))
+
+    async def _set_do_not_unban(self, user_id: int, reason: str, added_by: str):
+        self.blacklisted_users[user_id] = {"reason": reason, "added_by": added_by}
+        await self.metadata.set_do_not_unban(user_id, reason, added_by)
+
+    async def _remove_do_not_unban(self, user_id: int):
+        self.blacklisted_users.pop(user_id, None)
+        await self.metadata.remove_do_not_unban(user_id)
+
+    def _ban_dm_embed(self, reason: str, servers: str) -> discord.Embed:
+        ban_embed = discord.Embed(
+            title="You have been banned",
+            description=(f"**Reason:** {reason}\n\n**Servers:** {servers}\n\n"
+                         "You may appeal using the link below. Appeals will be reviewed within 12 hours.\n"
+                         "Try rejoining after 24 hours. If still banned, you can reapply in 30 days."),
+            color=discord.Color.red()
+        )
+        ban_embed.add_field(name="Appeal Link", value=f"[Click here to appeal]({APPEAL_LINK})", inline=False)
+        return ban_embed
+
+    def _queue_dm(self, user_id: int, embed: discord.Embed) -> asyncio.Future:
+        async def deliver():
+            try:
+                user = await self.resolver.resolve(user_id)
+                await user.send(embed=embed)
+            except discord.HTTPException:
+                pass
+        return self.delivery.submit(deliver)
+
+    def _queue_notices(self, user_id: int, log, channel, action_embed):
+        """Queue the log-channel entry and public action embed for a user once they're resolved.
+
+        ``log`` and ``action_embed`` are called with the resolved user.
+        """
+        async def deliver_log():
+            try:
+                user = await self.resolver.resolve(user_id)
+            except discord.HTTPException:
+                return
+            await log(user)
+
+        async def deliver_action():
+            try:
+                user = await self.resolver.resolve(user_id)
+            except discord.HTTPException:
+                return
+            await channel.send(embed=action_embed(user))
+
+        self.delivery.submit(deliver_log)
+        if channel is not None:
+            self.delivery.submit(deliver_action)
 
     def _error_embed(self, message: str) -> discord.Embed:
         return discord.Embed(title="❌ Error", description=message, color=discord.Color.red())
@@ -61,9 +445,63 @@ class ServerBan(red_commands.Cog):
         except Exception:
             pass
 
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        self._record_ban_event(guild.id, user.id, True)
+
+    @commands.Cog.listener()
+    async def on_member_unban(self, guild: discord.Guild, user: discord.User):
+        self._record_ban_event(guild.id, user.id, False)
+        if user.id in self.global_ban_list:
+            self._reconciled_generation.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        # global_ban_list is a bisect over the memory-mapped ID array plus a set probe,
+        # a couple of microseconds even with a million IDs, so join floods stay cheap.
+        if member.id not in self.global_ban_list or member.guild.id in self.server_blacklist:
+            return
+        try:
+            await self._ban_and_index(member.guild, member.id, "Global ban enforced on join")
+        except discord.Forbidden:
+            print(f"[GlobalBan Join] Missing permissions in {member.guild.name} ({member.guild.id})")
+        except discord.HTTPException as e:
+            print(f"[GlobalBan Join] Could not ban {member.id} in {member.guild.name}: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if guild.id in self.server_blacklist:
+            return
+        try:
+            # A new guild gets the whole global list right away instead of at the next pass.
+            await self.reconcile_guild(guild)
+        except Exception as e:
+            print(f"[GlobalBan Index] Error in {guild.name}: {e}")
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._drop_guild_index(guild.id)
+        self._reconciled_generation.pop(guild.id, None)
+
     async def cog_load(self):
+        if self._index_warm_task is None or self._index_warm_task.done():
+            self._index_warm_task = asyncio.create_task(self._warm_ban_index())
         if getattr(self, "_sync_task", None) is None or self._sync_task.done():
             self._sync_task = asyncio.create_task(self.global_ban_sync_loop())
+        self.jobs.resume()
+        if self.replication is not None:
+            await self.replication.start()
+
+    async def cog_unload(self):
+        for task in (self._sync_task, self._index_warm_task, self._replicated_sync_task):
+            if task is not None:
+                task.cancel()
+        if self.replication is not None:
+            await self.replication.close()
+        await self.jobs.close()
+        await self.delivery.close()
+        self.metadata.close()
+        await self.journal.close()
 
     @app_commands.command(name="sbanbl", description="Add or remove a user from the Do Not Unban list.")
     @app_commands.describe(user_id="User ID to add/remove", reason="Reason for blacklisting (if adding)")
@@ -74,19 +512,18 @@ class ServerBan(red_commands.Cog):
         try:
             user_id = int(user_id)
         except ValueError:
+            user_id = 0
+        if not is_valid_id(user_id):
             return await interaction.response.send_message(embed=self._error_embed("Invalid user ID."), ephemeral=True)
 
         if user_id in self.blacklisted_users:
-            del self.blacklisted_users[user_id]
+            await self._remove_do_not_unban(user_id)
             return await interaction.response.send_message(embed=self._success_embed("User removed from the Do Not Unban list."), ephemeral=True)
 
         if not reason:
             return await interaction.response.send_message(embed=self._error_embed("Reason required when adding a user."), ephemeral=True)
 
-        self.blacklisted_users[user_id] = {
-            "reason": reason,
-            "added_by": str(interaction.user)
-        }
+        await self._set_do_not_unban(user_id, reason, str(interaction.user))
 
         return await interaction.response.send_message(embed=self._success_embed("User added to the Do Not Unban list."), ephemeral=False)
 
@@ -98,6 +535,8 @@ class ServerBan(red_commands.Cog):
         try:
             user_id = int(user_id)
         except ValueError:
+            user_id = 0
+        if not is_valid_id(user_id):
             return await interaction.response.send_message(embed=self._error_embed("Invalid user ID."), ephemeral=True)
 
         is_global_flag = is_global.value.lower() == "yes"
@@ -111,48 +550,33 @@ class ServerBan(red_commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        try:
-            user = await self.bot.fetch_user(user_id)
-            ban_embed = discord.Embed(
-                title="You have been banned",
-                description=(f"**Reason:** {reason}\n\n**Servers:** "
-                             f"{'KCN Globalban' if is_global_flag else interaction.guild.name}\n\n"
-                             "You may appeal using the link below. Appeals will be reviewed within 12 hours.\n"
-                             "Try rejoining after 24 hours. If still banned, you can reapply in 30 days."),
-                color=discord.Color.red()
-            )
-            ban_embed.add_field(name="Appeal Link", value=f"[Click here to appeal]({APPEAL_LINK})", inline=False)
-            await user.send(embed=ban_embed)
-        except discord.HTTPException:
-            pass
-
-        guilds = [g for g in self.bot.guilds if g.id not in self.server_blacklist] if is_global_flag else [interaction.guild]
-        results = []
-
-        for guild in guilds:
-            try:
-                is_banned = False
-                async for entry in guild.bans():
-                    if entry.user.id == user_id:
-                        is_banned = True
-                        break
-                if not is_banned:
-                    await guild.ban(discord.Object(id=user_id), reason=reason)
-                    results.append(f"✅ {guild.name}")
-                else:
-                    results.append(f"⚠️ {guild.name}: Already banned")
-            except Exception as e:
-                results.append(f"❌ {guild.name}: {e}")
+        servers = "KCN Globalban" if is_global_flag else interaction.guild.name
+        dm = self._queue_dm(user_id, self._ban_dm_embed(reason, servers))
+        # The DM has to land while we still share a server with the user, so give it a
+        # short head start; everything else is delivered after enforcement.
+        await asyncio.wait({dm}, timeout=DM_GRACE_PERIOD)
 
         if is_global_flag:
-            self.global_ban_list.add(user_id)
-            self._save_global_bans()
-            await self.log_global_ban(user, moderator, reason)
+            # On the list first, so the sync loop enforces it even if the job is cut short.
+            await self._add_global_ban(user_id)
+            guild_ids = [g.id for g in self._target_guilds(interaction, True)]
+            job = await self.jobs.submit("ban", {"user_id": user_id, "reason": reason}, guild_ids, moderator.id, interaction.channel_id, watched=True)
+            await self._watch_job(interaction, job, "Ban Results")
+            log = lambda user: self.log_global_ban(user, moderator, reason)
         else:
-            await self.log_regular_ban(user, moderator, reason, interaction.guild)
-
-        await interaction.followup.send(embed=discord.Embed(title="Ban Results", description="\n".join(results), color=discord.Color.orange()))
-        await interaction.channel.send(embed=self._action_embed(user, "ban", reason, moderator, is_global_flag))
+            guilds = self._target_guilds(interaction, False)
+            progress = ProgressMessage(interaction, "Ban Results")
+            await progress.start(len(guilds))
+            results = await self.fanout.run(guilds, lambda g: self._ban_in_guild(g, user_id, reason), progress.update)
+            await progress.finish(results)
+            log = lambda user: self.log_regular_ban(user, moderator, reason, interaction.guild)
+
+        await self.metadata.record("ban", [user_id], moderator.id, reason, interaction.guild_id, is_global_flag)
+
+        self._queue_notices(
+            user_id, log, interaction.channel,
+            lambda user: self._action_embed(user, "ban", reason, moderator, is_global_flag)
+        )
 
     async def log_regular_ban(self, user: discord.User, moderator: discord.User, reason: str, guild: discord.Guild):
         log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
@@ -198,22 +622,12 @@ class ServerBan(red_commands.Cog):
         await log_channel.send(embed=embed, view=view)
 
     async def do_global_ban(self, user: discord.User, moderator: discord.User, reason: str, interaction: discord.Interaction):
-        for guild in self.bot.guilds:
-            if guild.id in self.server_blacklist:
-                continue
-            try:
-                is_banned = False
-                async for entry in guild.bans():
-                    if entry.user.id == user.id:
-                        is_banned = True
-                        break
-                if not is_banned:
-                    await guild.ban(discord.Object(id=user.id), reason=reason)
-            except Exception:
-                pass
-        self.global_ban_list.add(user.id)
-        self._save_global_bans()
-        await self.log_global_ban(user, moderator, reason)
+        guilds = [g for g in self.bot.guilds if g.id not in self.server_blacklist]
+        await self.fanout.run(guilds, lambda g: self._ban_in_guild(g, user.id, reason))
+        await self._add_global_ban(user.id)
+        escalated_by = interaction.user if interaction is not None else moderator
+        await self.metadata.record("ban", [user.id], escalated_by.id, reason, getattr(interaction, "guild_id", None), True)
+        self.delivery.submit(lambda: self.log_global_ban(user, moderator, reason))
 
     @app_commands.command(name="sunban", description="Unban a user by ID.")
     @app_commands.describe(user_id="User ID to unban", is_global="Unban in all servers?", reason="Reason for unbanning")
@@ -226,6 +640,8 @@ class ServerBan(red_commands.Cog):
         try:
             user_id = int(user_id)
         except ValueError:
+            user_id = 0
+        if not is_valid_id(user_id):
             return await interaction.response.send_message(embed=self._error_embed("Invalid user ID."), ephemeral=True)
 
         is_global_flag = is_global.value.lower() == "yes"
@@ -248,43 +664,29 @@ class ServerBan(red_commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        guilds = [g for g in self.bot.guilds if g.id not in self.server_blacklist] if is_global_flag else [interaction.guild]
-        results = []
+        if is_global_flag:
+            # Off the list before the fan-out, or a reconcile running meanwhile would
+            # see the fresh unbans as missing bans and put them back.
+            await self._remove_global_ban(user_id)
 
-        for guild in guilds:
-            try:
-                await guild.unban(discord.Object(id=user_id), reason=reason)
-                results.append(f"✅ {guild.name}")
-            except Exception as e:
-                results.append(f"❌ {guild.name}: {e}")
+        guilds = self._target_guilds(interaction, is_global_flag)
+        progress = ProgressMessage(interaction, "Unban Results")
+        await progress.start(len(guilds))
+        results = await self.fanout.run(guilds, lambda g: self._unban_in_guild(g, user_id, reason), progress.update)
 
-        try:
-            user = await self.bot.fetch_user(user_id)
-            dm_embed = discord.Embed(
-                title="You have been unbanned",
-                description=f"Reason: {reason}",
-                color=discord.Color.green()
-            )
-            await user.send(embed=dm_embed)
-        except discord.HTTPException:
-            pass
-
-        if is_global_flag:
-            self.global_ban_list.discard(user_id)
-            self._save_global_bans()
+        await self.metadata.record("unban", [user_id], moderator.id, reason, interaction.guild_id, is_global_flag)
 
-        await self.log_global_unban(user, moderator, reason)
+        await progress.finish(results)
 
-        await interaction.followup.send(embed=discord.Embed(
-            title="Unban Results",
-            description="\n".join(results),
-            color=discord.Color.orange()
+        self._queue_dm(user_id, discord.Embed(
+            title="You have been unbanned",
+            description=f"Reason: {reason}",
+            color=discord.Color.green()
         ))
-
-        try:
-            await interaction.channel.send(embed=self._action_embed(user, "unban", reason, moderator, is_global_flag))
-        except Exception:
-            pass
+        self._queue_notices(
+            user_id, lambda user: self.log_global_unban(user, moderator, reason), interaction.channel,
+            lambda user: self._action_embed(user, "unban", reason, moderator, is_global_flag)
+        )
 
     @app_commands.command(name="bansync", description="Sync all globally banned users to this server.")
     async def bansync(self, interaction: discord.Interaction):
@@ -297,15 +699,15 @@ class ServerBan(red_commands.Cog):
         await interaction.response.defer(ephemeral=True)
         results = []
 
-        for user_id in self.global_ban_list:
+        try:
+            banned = await self._ensure_ban_index(interaction.guild)
+        except discord.HTTPException as e:
+            return await interaction.followup.send(embed=self._error_embed(f"Could not read this server's bans: {e}"))
+
+        for user_id in list(self.global_ban_list):
             try:
-                is_banned = False
-                async for entry in interaction.guild.bans():
-                    if entry.user.id == user_id:
-                        is_banned = True
-                        break
-                if not is_banned:
-                    await interaction.guild.ban(discord.Object(id=user_id), reason="Global ban sync")
+                if user_id not in banned:
+                    await self._ban_and_index(interaction.guild, user_id, "Global ban sync")
                     results.append(f"✅ {user_id}")
                 else:
                     results.append(f"⚠️ {user_id}: Already banned")
@@ -324,25 +726,82 @@ class ServerBan(red_commands.Cog):
             await interaction.channel.send(embed=embed)
         self.last_ban_sync = datetime.utcnow()
 
-    @app_commands.command(name="massglobalban", description="Globally ban up to 5 users at once.")
+    async def _read_id_attachment(self, attachment: discord.Attachment) -> list:
+        """Stream a newline/CSV attachment and return the user IDs in it, in order."""
+        user_ids = []
+        async with aiohttp.ClientSession() as session:
+            async with session.get(attachment.url) as resp:
+                resp.raise_for_status()
+                async for line in resp.content:
+                    user_ids.extend(user_id for user_id in map(int, ID_PATTERN.findall(line)) if is_valid_id(user_id))
+        return user_ids
+
+    async def _ban_each_in_guild(self, guild: discord.Guild, user_ids: list, reason: str, enforced: set):
+        """Ban ``user_ids`` one request at a time; returns ``(banned, failed)``."""
+        banned = failed = 0
+        for i, user_id in enumerate(user_ids):
+            try:
+                await self._ban_and_index(guild, user_id, reason)
+            except discord.Forbidden:
+                failed += len(user_ids) - i
+                break
+            except discord.HTTPException:
+                failed += 1
+                continue
+            enforced.add(user_id)
+            banned += 1
+        return banned, failed
+
+    async def _bulk_ban_in_guild(self, guild: discord.Guild, user_ids: list, reason: str, enforced: set) -> str:
+        banned_set = await self._ensure_ban_index(guild)
+        to_ban = [user_id for user_id in user_ids if user_id not in banned_set]
+        already = len(user_ids) - len(to_ban)
+        enforced.update(user_id for user_id in user_ids if user_id in banned_set)
+        banned = failed = 0
+
+        for start in range(0, len(to_ban), BULK_BAN_CHUNK):
+            chunk = to_ban[start:start + BULK_BAN_CHUNK]
+            try:
+                result = await guild.bulk_ban([discord.Object(id=user_id) for user_id in chunk], reason=reason)
+            except discord.Forbidden:
+                # Bulk bans also need Manage Server; with only Ban Members, go one at a time.
+                single_banned, single_failed = await self._ban_each_in_guild(guild, to_ban[start:], reason, enforced)
+                banned += single_banned
+                failed += single_failed
+                break
+            except discord.HTTPException:
+                failed += len(chunk)
+                continue
+            for obj in result.banned:
+                self._record_ban_event(guild.id, obj.id, True)
+                enforced.add(obj.id)
+            banned += len(result.banned)
+            failed += len(result.failed)
+
+        icon = "✅" if not failed else ("⚠️" if banned or already else "❌")
+        return f"{icon} {guild.name}: {banned} banned, {already} already banned, {failed} failed"
+
+    @app_commands.command(name="massglobalban", description="Globally ban many users at once (inline IDs and/or a file of IDs).")
     @app_commands.describe(
-        user1="User ID #1 to ban",
+        user1="User ID #1 to ban (optional if a file is attached)",
         user2="User ID #2 to ban (optional)",
         user3="User ID #3 to ban (optional)",
         user4="User ID #4 to ban (optional)",
         user5="User ID #5 to ban (optional)",
+        file="Text/CSV file of user IDs, one per line or comma-separated (optional)",
         reason="Reason for banning (required)"
     )
     @app_commands.checks.has_permissions(ban_members=True)
     async def massglobalban(
         self,
         interaction: discord.Interaction,
-        user1: str,
         reason: str,
+        user1: Optional[str] = None,
         user2: Optional[str] = None,
         user3: Optional[str] = None,
         user4: Optional[str] = None,
         user5: Optional[str] = None,
+        file: Optional[discord.Attachment] = None,
     ):
         if interaction.user.id not in ALLOWED_GLOBAL_IDS:
             return await interaction.response.send_message(
@@ -357,119 +816,197 @@ class ServerBan(red_commands.Cog):
             if uid is None:
                 continue
             try:
-                user_ids.append(int(uid))
+                user_id = int(uid)
             except ValueError:
+                user_id = 0
+            if is_valid_id(user_id):
+                user_ids.append(user_id)
+            else:
                 return await interaction.response.send_message(
                     embed=self._error_embed(f"Invalid user ID: {uid}"),
                     ephemeral=True
                 )
 
-        await interaction.response.defer(ephemeral=True)
-
-        results = []
-        for user_id in user_ids:
-            try:
-                user = await self.bot.fetch_user(user_id)
-            except Exception:
-                results.append(f"❌ {user_id}: User not found")
-                continue
+        if file is not None and file.size > MAX_ID_FILE_SIZE:
+            return await interaction.response.send_message(
+                embed=self._error_embed(f"File is too large (max {MAX_ID_FILE_SIZE // 1024} KB)."),
+                ephemeral=True
+            )
 
-            if user_id in self.global_ban_list:
-                results.append(f"⚠️ {user}: Already globally banned")
-                continue
+        await interaction.response.defer(ephemeral=True)
 
+        if file is not None:
             try:
-                ban_embed = discord.Embed(
-                    title="You have been banned",
-                    description=(
-                        f"**Reason:** {reason}\n\n"
-                        f"**Servers:** KCN Globalban\n\n"
-                        "You may appeal using the link below. Appeals will be reviewed within 12 hours.\n"
-                        "Try rejoining after 24 hours. If still banned, you can reapply in 30 days."
-                    ),
-                    color=discord.Color.red()
-                )
-                ban_embed.add_field(name="Appeal Link", value=f"[Click here to appeal]({APPEAL_LINK})", inline=False)
-                await user.send(embed=ban_embed)
-            except discord.HTTPException:
-                pass
+                user_ids.extend(await self._read_id_attachment(file))
+            except aiohttp.ClientError as e:
+                return await interaction.followup.send(embed=self._error_embed(f"Could not read the attached file: {e}"))
+
+        # Dedupe while keeping the order they were given in.
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return await interaction.followup.send(embed=self._error_embed("No user IDs were provided."))
+
+        new_ids = [user_id for user_id in user_ids if user_id not in self.global_ban_list]
+        header = []
+        if len(new_ids) < len(user_ids):
+            header.append(f"⚠️ {len(user_ids) - len(new_ids)} already globally banned (skipped)")
+        if not new_ids:
+            return await interaction.followup.send(embed=discord.Embed(
+                title="Mass Global Ban Results", description="\n".join(header), color=discord.Color.orange()
+            ))
+
+        # Named users in a small batch get the usual DM; raid-sized batches don't.
+        notify = len(new_ids) <= MASS_NOTIFY_LIMIT
+        if notify:
+            ban_embed = self._ban_dm_embed(reason, "KCN Globalban")
+            dms = {self._queue_dm(user_id, ban_embed) for user_id in new_ids}
+            await asyncio.wait(dms, timeout=DM_GRACE_PERIOD)
+
+        guild_ids = [g.id for g in self.bot.guilds if g.id not in self.server_blacklist]
+        job = await self.jobs.submit(
+            "bulkban", {"user_ids": new_ids, "reason": reason, "guild_id": interaction.guild_id},
+            guild_ids, interaction.user.id, interaction.channel_id, watched=True
+        )
+        if not await self._watch_job(interaction, job, "Mass Global Ban Results", header=header):
+            return
 
-            ban_success = False
-            for guild in self.bot.guilds:
-                if guild.id in self.server_blacklist:
-                    continue
-                try:
-                    is_banned = False
-                    async for entry in guild.bans():
-                        if entry.user.id == user_id:
-                            is_banned = True
-                            break
-                    if not is_banned:
-                        await guild.ban(discord.Object(id=user_id), reason=reason)
-                        ban_success = True
-                except Exception:
-                    pass
-
-            if ban_success:
-                self.global_ban_list.add(user_id)
-                self._save_global_bans()
-                results.append(f"✅ {user}")
-                try:
-                    await interaction.channel.send(embed=self._action_embed(user, "ban", reason, interaction.user, is_global=True))
-                    await self.log_global_ban(user, interaction.user, reason)
-                except Exception:
-                    pass
-            else:
-                results.append(f"❌ {user}: Could not ban in any guild")
+        # The list, metadata and log entries were handled by _job_bulk_ban_done.
+        enforced = set(job.state.get("enforced", []))
+        added = [user_id for user_id in new_ids if user_id in enforced]
+        await interaction.followup.send(embed=self._success_embed(
+            f"{len(added)}/{len(new_ids)} users added to the global ban list."
+        ))
 
-        await interaction.followup.send(
-            embed=discord.Embed(
-                title="Mass Global Ban Results",
-                description="\n".join(results),
-                color=discord.Color.orange()
-            ),
-            ephemeral=True
-        )
+    def _prefix_ranges(self, prefix: str):
+        """ID value ranges (lo, hi) whose decimal form starts with ``prefix``, ascending."""
+        if not prefix:
+            return [(0, 2 ** 63 - 1)]
+        ranges = []
+        for digits in range(max(len(prefix), 15), 21):
+            scale = 10 ** (digits - len(prefix))
+            ranges.append((int(prefix) * scale, (int(prefix) + 1) * scale))
+        return ranges
+
+    def _ban_list_segments(self, prefix: str):
+        """Sorted-position ranges of the global ban list that match ``prefix``."""
+        store = self.global_ban_list
+        if not prefix:
+            return [(0, len(store))]
+        segments = []
+        for lo, hi in self._prefix_ranges(prefix):
+            start, stop = store.rank(lo), store.rank(hi)
+            if start < stop:
+                segments.append((start, stop))
+        return segments
+
+    def _ban_list_page(self, segments, offset: int, count: int):
+        ids = []
+        for start, stop in segments:
+            size = stop - start
+            if offset >= size:
+                offset -= size
+                continue
+            ids.extend(self.global_ban_list.slice(start + offset, min(stop, start + offset + count - len(ids))))
+            offset = 0
+            if len(ids) >= count:
+                break
+        return ids
+
+    def _export_ban_list_sync(self, ids, prefix: str, compress: bool) -> io.BytesIO:
+        buf = io.BytesIO()
+        raw = gzip.GzipFile(fileobj=buf, mode="wb") if compress else buf
+        text = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+        writer = csv.writer(text)
+        writer.writerow(["user_id"])
+        if prefix:
+            ids = (user_id for user_id in ids if str(user_id).startswith(prefix))
+        writer.writerows((user_id,) for user_id in ids)
+        text.flush()
+        text.detach()
+        if compress:
+            raw.close()
+        buf.seek(0)
+        return buf
 
     @app_commands.command(name="globalbanlist", description="Shows the list of globally banned users.")
-    @app_commands.describe(ephemeral="Send the response as ephemeral (only visible to you).")
-    async def globalbanlist(self, interaction: discord.Interaction, ephemeral: Optional[bool] = True):
+    @app_commands.describe(
+        ephemeral="Send the response as ephemeral (only visible to you).",
+        prefix="Only show IDs starting with these digits",
+        page="Page to open on",
+        export="Send the list as a file instead"
+    )
+    @app_commands.choices(export=[
+        app_commands.Choice(name="CSV", value="csv"),
+        app_commands.Choice(name="CSV (gzip)", value="csv.gz")
+    ])
+    async def globalbanlist(
+        self,
+        interaction: discord.Interaction,
+        ephemeral: Optional[bool] = True,
+        prefix: Optional[str] = None,
+        page: Optional[int] = 1,
+        export: Optional[app_commands.Choice[str]] = None,
+    ):
         if interaction.user.id not in ALLOWED_GLOBAL_IDS:
             return await interaction.response.send_message(
                 embed=self._error_embed("You are not authorized to use this command."),
                 ephemeral=True
             )
 
+        prefix = (prefix or "").strip()
+        if prefix and (not prefix.isdigit() or len(prefix) > 20):
+            return await interaction.response.send_message(embed=self._error_embed("The prefix must be up to 20 digits."), ephemeral=True)
+
         if not self.global_ban_list:
             return await interaction.response.send_message(
                 embed=self._success_embed("The global ban list is currently empty."),
                 ephemeral=True
             )
 
-        entries = [f"<@{user_id}> `{user_id}`" for user_id in self.global_ban_list]
+        if export is not None:
+            await interaction.response.defer(ephemeral=ephemeral)
+            compress = export.value == "csv.gz"
+            buf = await self.global_ban_list.stream(lambda ids: self._export_ban_list_sync(ids, prefix, compress))
+            filename = f"global_ban_list.{export.value}"
+            return await interaction.followup.send(file=discord.File(buf, filename=filename), ephemeral=ephemeral)
+
+        cog = self
+
+        class JumpModal(discord.ui.Modal):
+            def __init__(self, view, label, placeholder):
+                super().__init__(title="Global Ban List")
+                self.list_view = view
+                self.value = discord.ui.TextInput(label=label, placeholder=placeholder, required=False, max_length=20)
+                self.add_item(self.value)
+
+            async def on_submit(self, i: discord.Interaction):
+                await self.list_view.apply_input(i, self.value.label, self.value.value.strip())
 
         class BanListView(discord.ui.View):
-            def __init__(self, entries, per_page, user, ephemeral):
+            def __init__(self, per_page, user, prefix, page):
                 super().__init__(timeout=None)
-                self.entries = entries
                 self.per_page = per_page
                 self.user = user
-                self.ephemeral = ephemeral
-                self.current_page = 0
-                self.total_pages = (len(entries) - 1) // per_page + 1
+                self.prefix = prefix
+                self.current_page = page
+                self.total_pages = 1
 
                 self.prev_button = discord.ui.Button(label="⬅ Previous", style=discord.ButtonStyle.secondary)
                 self.next_button = discord.ui.Button(label="Next ➡", style=discord.ButtonStyle.secondary)
+                self.jump_button = discord.ui.Button(label="🔢 Page", style=discord.ButtonStyle.secondary)
+                self.search_button = discord.ui.Button(label="🔍 Search", style=discord.ButtonStyle.secondary)
                 self.stop_button = discord.ui.Button(label="❌ Close", style=discord.ButtonStyle.danger)
 
                 self.prev_button.callback = self.prev_page
                 self.next_button.callback = self.next_page
+                self.jump_button.callback = self.jump
+                self.search_button.callback = self.search
                 self.stop_button.callback = self.stop
 
-                self.update_buttons()
-
                 self.add_item(self.prev_button)
                 self.add_item(self.next_button)
+                self.add_item(self.jump_button)
+                self.add_item(self.search_button)
                 self.add_item(self.stop_button)
 
             def update_buttons(self):
@@ -477,40 +1014,76 @@ class ServerBan(red_commands.Cog):
                 self.next_button.disabled = self.current_page >= self.total_pages - 1
 
             def get_current_embed(self):
-                start = self.current_page * self.per_page
-                end = start + self.per_page
-                page_entries = self.entries[start:end]
+                # Positions are worked out against the list as it is now, so pages stay
+                # correct while bans are added or removed between clicks.
+                segments = cog._ban_list_segments(self.prefix)
+                total = sum(stop - start for start, stop in segments)
+                self.total_pages = max(1, (total - 1) // self.per_page + 1)
+                self.current_page = max(0, min(self.current_page, self.total_pages - 1))
+                self.update_buttons()
+
+                page_ids = cog._ban_list_page(segments, self.current_page * self.per_page, self.per_page)
+                title = f"Global Ban List (Page {self.current_page + 1} of {self.total_pages})"
+                if self.prefix:
+                    title += f" · {total} matching `{self.prefix}`"
                 embed = discord.Embed(
-                    title=f"Global Ban List (Page {self.current_page + 1} of {self.total_pages})",
-                    description="\n".join(page_entries),
+                    title=title,
+                    description="\n".join(f"<@{user_id}> `{user_id}`" for user_id in page_ids) or "No matching IDs.",
                     color=discord.Color.orange()
                 )
                 return embed
 
-            async def prev_page(self, i):
+            async def check_user(self, i):
                 if i.user != self.user:
-                    return await i.response.send_message("You can’t use these buttons.", ephemeral=True)
+                    await i.response.send_message("You can’t use these buttons.", ephemeral=True)
+                    return False
+                return True
+
+            async def prev_page(self, i):
+                if not await self.check_user(i):
+                    return
                 self.current_page -= 1
                 await self.update_message(i)
 
             async def next_page(self, i):
-                if i.user != self.user:
-                    return await i.response.send_message("You can’t use these buttons.", ephemeral=True)
+                if not await self.check_user(i):
+                    return
                 self.current_page += 1
                 await self.update_message(i)
 
+            async def jump(self, i):
+                if not await self.check_user(i):
+                    return
+                await i.response.send_modal(JumpModal(self, "Page", f"1-{self.total_pages}"))
+
+            async def search(self, i):
+                if not await self.check_user(i):
+                    return
+                await i.response.send_modal(JumpModal(self, "ID prefix", "Leave empty to show every ID"))
+
+            async def apply_input(self, i, label, value):
+                if label == "Page":
+                    if not value.isdigit():
+                        return await i.response.send_message("Enter a page number.", ephemeral=True)
+                    self.current_page = int(value) - 1
+                else:
+                    if value and (not value.isdigit() or len(value) > 20):
+                        return await i.response.send_message("The prefix must be up to 20 digits.", ephemeral=True)
+                    self.prefix = value
+                    self.current_page = 0
+                await self.update_message(i)
+
             async def stop(self, i):
-                if i.user != self.user:
-                    return await i.response.send_message("You can’t use these buttons.", ephemeral=True)
+                if not await self.check_user(i):
+                    return
                 await i.message.delete()
-                self.stop()
+                super().stop()
 
             async def update_message(self, i):
                 embed = self.get_current_embed()
-                self.update_buttons()
                 await i.response.edit_message(embed=embed, view=self)
 
-        view = BanListView(entries=entries, per_page=20, user=interaction.user, ephemeral=ephemeral)
+        view = BanListView(per_page=20, user=interaction.user, prefix=prefix, page=(page or 1) - 1)
         await interaction.response.send_message(embed=view.get_current_embed(), view=view, ephemeral=ephemeral)
 
     @app_commands.command(name="globalbansync", description="Sync all global bans across all servers.")
@@ -522,29 +1095,12 @@ class ServerBan(red_commands.Cog):
             )
 
         await interaction.response.defer(ephemeral=False)
-        results = []
 
-        for guild in self.bot.guilds:
-            if guild.id in self.server_blacklist:
-                continue
-
-            guild_results = []
-            for user_id in self.global_ban_list:
-                try:
-                    already_banned = False
-                    async for entry in guild.bans():
-                        if entry.user.id == user_id:
-                            already_banned = True
-                            break
-                    if already_banned:
-                        guild_results.append(f"⚠️ `{user_id}` already banned")
-                    else:
-                        await guild.ban(discord.Object(id=user_id), reason="Global ban sync")
-                        guild_results.append(f"✅ `{user_id}` banned")
-                except Exception as e:
-                    guild_results.append(f"❌ `{user_id}`: {e}")
-
-            results.append(f"**{guild.name}** ({guild.id}):\n" + "\n".join(guild_results))
+        guild_ids = [g.id for g in self.bot.guilds if g.id not in self.server_blacklist]
+        job = await self.jobs.submit("sync", {}, guild_ids, interaction.user.id, interaction.channel_id, watched=True)
+        if not await self._watch_job(interaction, job, "Global Ban Sync Progress"):
+            return
+        results = job.results
 
         chunks = []
         chunk = ""
@@ -563,22 +1119,101 @@ class ServerBan(red_commands.Cog):
                 color=discord.Color.orange()
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
-        self.last_ban_sync = datetime.utcnow()
+
+    @app_commands.command(name="jobs", description="Show the status of long-running global moderation jobs.")
+    async def jobs_status(self, interaction: discord.Interaction):
+        if interaction.user.id not in ALLOWED_GLOBAL_IDS:
+            return await interaction.response.send_message(
+                embed=self._error_embed("You are not authorized to use this command."),
+                ephemeral=True
+            )
+
+        jobs = sorted(self.jobs.jobs.values(), key=lambda j: j.id, reverse=True)[:10]
+        if not jobs:
+            return await interaction.response.send_message(embed=self._success_embed("No jobs have been run yet."), ephemeral=True)
+
+        embed = discord.Embed(title="🛠️ Global Moderation Jobs", color=discord.Color.blue())
+        for job in jobs:
+            value = f"**Status:** {job.status} — {job.done}/{job.total} servers"
+            eta = job.eta()
+            if not job.is_finished and eta is not None:
+                value += f"\n**ETA:** ~{int(eta // 60)}m {int(eta % 60)}s"
+            if job.error:
+                value += f"\n**Error:** {job.error}"
+            value += f"\n**Started:** <t:{int(job.created_at)}:R> by <@{job.requested_by}>"
+            embed.add_field(name=f"#{job.id} · {JOB_LABELS.get(job.kind, job.kind)}", value=value, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="globalbansearch", description="Search ban history by user, moderator and time.")
+    @app_commands.describe(
+        user_id="Only actions against this user ID",
+        moderator="Only actions by this moderator",
+        days="Only actions from the last N days",
+        action="Only bans or only unbans",
+        limit="How many results to show (max 25)"
+    )
+    @app_commands.choices(action=[app_commands.Choice(name="Bans", value="ban"), app_commands.Choice(name="Unbans", value="unban")])
+    async def globalbansearch(
+        self,
+        interaction: discord.Interaction,
+        user_id: Optional[str] = None,
+        moderator: Optional[discord.User] = None,
+        days: Optional[int] = None,
+        action: Optional[app_commands.Choice[str]] = None,
+        limit: Optional[int] = 10,
+    ):
+        if interaction.user.id not in ALLOWED_GLOBAL_IDS:
+            return await interaction.response.send_message(
+                embed=self._error_embed("You are not authorized to use this command."),
+                ephemeral=True
+            )
+
+        if user_id is not None:
+            try:
+                user_id = int(user_id)
+            except ValueError:
+                user_id = 0
+            if not is_valid_id(user_id):
+                return await interaction.response.send_message(embed=self._error_embed("Invalid user ID."), ephemeral=True)
+
+        since = time.time() - days * 86400 if days else None
+        rows = await self.metadata.search(
+            user_id=user_id,
+            moderator_id=moderator.id if moderator else None,
+            since=since,
+            action=action.value if action else None,
+            limit=max(1, min(limit or 10, 25)),
+        )
+        if not rows:
+            return await interaction.response.send_message(embed=self._success_embed("No matching ban records."), ephemeral=True)
+
+        lines = []
+        for row in rows:
+            guild = self.bot.get_guild(row["origin_guild_id"]) if row["origin_guild_id"] else None
+            where = "globally" if row["is_global"] else f"in {guild.name if guild else row['origin_guild_id']}"
+            reason = (row["reason"] or "No reason provided.")[:120]
+            lines.append(
+                f"<t:{int(row['created_at'])}:f> **{row['action']}** <@{row['user_id']}> `{row['user_id']}` "
+                f"{where} by <@{row['moderator_id']}>\n↳ {reason}"
+            )
+
+        description = "\n".join(lines)
+        if len(description) > 4000:
+            description = description[:3990] + "\n…"
+        embed = discord.Embed(title="🔎 Ban History", description=description, color=discord.Color.blue())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="globalbanstats", description="Show statistics about global bans.")
     async def globalbanstats(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
         num_global_bans = len(self.global_ban_list)
-        total_bans = 0
-        for guild in self.bot.guilds:
-            if guild.id in self.server_blacklist:
-                continue
-            try:
-                bans = [entry async for entry in guild.bans()]
-                total_bans += len(bans)
-            except Exception:
-                pass
+        guild_ids = [g.id for g in self.bot.guilds if g.id not in self.server_blacklist]
+        indexed = [gid for gid in guild_ids if gid in self.guild_ban_index]
+        total_bans = sum(len(self.guild_ban_index[gid]) for gid in indexed)
+        covered = sum(self.guild_global_coverage.get(gid, 0) for gid in indexed)
+        expected = num_global_bans * len(indexed)
+        coverage_str = f"{covered / expected:.1%}" if expected else "N/A"
 
         if self.last_ban_sync:
             last_sync_str = self.last_ban_sync.strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -591,6 +1226,9 @@ class ServerBan(red_commands.Cog):
         )
         embed.add_field(name="Global Bans", value=str(num_global_bans), inline=True)
         embed.add_field(name="Total Server Bans", value=str(total_bans), inline=True)
+        embed.add_field(name="Global List Coverage", value=coverage_str, inline=True)
+        if len(indexed) < len(guild_ids):
+            embed.add_field(name="Servers Indexed", value=f"{len(indexed)}/{len(guild_ids)}", inline=True)
         embed.add_field(name="Last Ban Sync", value=last_sync_str, inline=False)
 
         await interaction.followup.send(embed=embed, ephemeral=False)
@@ -644,10 +1282,7 @@ class ServerBan(red_commands.Cog):
                 self.add_item(self.reason)
 
             async def on_submit(self, interaction: discord.Interaction):
-                self.cog.blacklisted_users[self.target_user.id] = {
-                    "reason": self.reason.value,
-                    "added_by": str(interaction.user)
-                }
+                await self.cog._set_do_not_unban(self.target_user.id, self.reason.value, str(interaction.user))
                 self.button.style = discord.ButtonStyle.success
                 self.button.label = f"Escalated by {interaction.user.name}"
                 self.button.disabled = True
@@ -659,6 +1294,25 @@ class ServerBan(red_commands.Cog):
         view = EscalateView(self, user)
         await log_channel.send(embed=embed, view=view)
 
+    async def log_mass_global_ban(self, user_ids: list, moderator: discord.User, reason: str):
+        log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
+        if not log_channel:
+            return
+
+        preview = "\n".join(f"`{user_id}`" for user_id in user_ids[:20])
+        if len(user_ids) > 20:
+            preview += f"\n… and {len(user_ids) - 20} more"
+        embed = discord.Embed(
+            title="🚨 Mass Global Ban Issued",
+            description=f"{len(user_ids)} users have been globally banned.",
+            color=discord.Color.red(),
+            timestamp=datetime.utcnow()
+        )
+        embed.add_field(name="Users", value=preview, inline=False)
+        embed.add_field(name="Moderator", value=f"{moderator} (`{moderator.id}`)", inline=False)
+        embed.add_field(name="Reason", value=reason or "No reason provided.", inline=False)
+        await log_channel.send(embed=embed)
+
     async def log_global_unban(self, user: discord.User, moderator: discord.User, reason: str):
         log_channel = self.bot.get_channel(LOG_CHANNEL_ID)
         if not log_channel:
@@ -678,28 +1332,62 @@ class ServerBan(red_commands.Cog):
 
         await log_channel.send(embed=embed)
 
+    async def reconcile_guild(self, guild: discord.Guild, reason: str = "Scheduled global ban sync", force: bool = False) -> tuple:
+        """Ban every globally banned ID missing from a guild.
+
+        Returns ``(issued, already banned, failed)``. Deleted accounts count as
+        neither banned nor failed.
+
+        Guilds already reconciled at the current ban generation are skipped without any
+        REST traffic (unless ``force``, as for an explicit /globalbansync); otherwise the guild's bans are read once from the index and only
+        the set difference is banned. Once an index is older than
+        ``INDEX_REFRESH_INTERVAL`` the guild's bans are walked again first, so drift from
+        missed gateway events can't outlive the hour.
+        """
+        if self._index_is_stale(guild.id):
+            await self._ensure_ban_index(guild, refresh=True)
+        generation = self.ban_generation
+        if not force and self._reconciled_generation.get(guild.id) == generation:
+            return 0, len(self.global_ban_list), 0
+        banned = await self._ensure_ban_index(guild)
+        missing = await self._missing_global_bans(guild.id, banned)
+        already = len(self.global_ban_list) - len(missing)
+        issued = failed = 0
+        for user_id in missing:
+            try:
+                await self._ban_and_index(guild, user_id, reason)
+                issued += 1
+            except discord.NotFound:
+                # Deleted accounts can't be banned; there is nothing left to enforce.
+                continue
+            except discord.Forbidden:
+                raise
+            except discord.HTTPException as e:
+                print(f"[GlobalBan Sync] Could not ban {user_id} in {guild.name}: {e}")
+                failed += 1
+        if not failed:
+            self._reconciled_generation[guild.id] = generation
+        return issued, already, failed
+
+    async def sync_pass(self):
+        """One pass of the scheduled sync: reconcile every guild, then merge store deltas."""
+        semaphore = asyncio.Semaphore(self.fanout.concurrency)
+
+        async def reconcile(guild):
+            async with semaphore:
+                try:
+                    await self.reconcile_guild(guild)
+                except discord.Forbidden:
+                    print(f"[GlobalBan Sync] Missing permissions in {guild.name} ({guild.id})")
+                except Exception as e:
+                    print(f"[GlobalBan Sync] Error in {guild.name}: {e}")
+
+        await asyncio.gather(*(reconcile(g) for g in self.bot.guilds if g.id not in self.server_blacklist))
+        if self.global_ban_list.pending:
+            self.journal.schedule_compaction()
+
     async def global_ban_sync_loop(self):
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
-            for guild in self.bot.guilds:
-                if guild.id in self.server_blacklist:
-                    continue
-                for user_id in list(self.global_ban_list):
-                    try:
-                        already_banned = False
-                        async for entry in guild.bans():
-                            if entry.user.id == user_id:
-                                already_banned = True
-                                break
-                        if not already_banned:
-                            await guild.ban(discord.Object(id=user_id), reason="Scheduled global ban sync")
-                    except discord.Forbidden:
-                        print(f"[GlobalBan Sync] Missing permissions in {guild.name} ({guild.id})")
-                    except Exception as e:
-                        print(f"[GlobalBan Sync] Error in {guild.name}: {e}")
+            await self.sync_pass()
             await asyncio.sleep(300)
-            
-
-
-
-